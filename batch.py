@@ -0,0 +1,213 @@
+"""Analyze directories of filings without the Streamlit UI.
+
+Usage:
+    python batch.py "sample_reports/*.pdf" other_dir/ -o results.jsonl --max-workers 4
+    python batch.py screening/ -o headlines.jsonl --quick
+    python batch.py q3_filings/ -o q3.jsonl --period 2024-12-31 --store history/
+    python batch.py nightly_dump/ -o results.jsonl --time-limit 120 --memory-limit 2048
+
+Writes one JSON line per document (identical files are analyzed once).
+Re-running with the same output file resumes: documents whose SHA-256 is
+already recorded as ok (or aborted) in the same mode are skipped, failed
+ones are retried.
+--quick only reads pages until the headline numbers are found (see
+ComprehensiveFinancialAnalyzer.analyze_quick). --store also writes each
+analyzed document to a Parquet store for historical queries (see
+finsum.store.FilingStore), labelled with --period and the file name.
+With --time-limit or --memory-limit each document is analyzed in a
+supervised subprocess (see finsum.watchdog); one that crosses a limit is
+recorded as aborted with the stages it completed.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from finsum import ComprehensiveFinancialAnalyzer
+from finsum.page_extraction import TEXT_BACKENDS, default_text_backend
+from finsum.text_cache import file_digest
+from finsum.watchdog import analyze_supervised, default_memory_limit_mb, default_time_limit
+
+
+def find_pdfs(inputs):
+    """Expand files, directories (searched recursively) and glob patterns into PDF paths"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, "**", "*.pdf"), recursive=True)
+        else:
+            matches = glob.glob(item, recursive=True)
+        paths.extend(path for path in matches if os.path.isfile(path) and path.lower().endswith(".pdf"))
+    return sorted(set(os.path.abspath(path) for path in paths))
+
+
+def completed_digests(output_path, mode='full'):
+    """Digests already written to the output file in a mode; a torn last line is ignored"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get('status') in ('ok', 'aborted') and record.get('mode', 'full') == mode:
+                done.add(record['sha256'])
+    return done
+
+
+def analyze_file(path, digest, use_cache, quick=False, period=None, limits=None, backend=None,
+                 max_resident_pages=None):
+    """Analyze one PDF in a worker process and return its JSON record
+
+    limits is (time_limit, memory_limit_mb) for a supervised full analysis;
+    backend and max_resident_pages are passed to the analyzer.
+    """
+    record = {'path': path, 'sha256': digest, 'mode': 'quick' if quick else 'full'}
+    if period:
+        record['period'] = period
+    start = time.perf_counter()
+    try:
+        options = {'workers': 1, 'cache': None if use_cache else False, 'backend': backend,
+                   'max_resident_pages': max_resident_pages}
+        analyzer = ComprehensiveFinancialAnalyzer(**options)
+        if quick:
+            result = analyzer.analyze_quick(path)
+            extracted = finished = time.perf_counter()
+        elif limits:
+            result = analyze_supervised(path, os.path.basename(path), *limits, analyzer_options=options)
+            # The child's stage times are in the metrics; here only the total is known
+            extracted = None
+            finished = time.perf_counter()
+        else:
+            read = analyzer.read_pages(path)
+            extracted = time.perf_counter()
+            if not read:
+                raise ValueError("could not read PDF")
+            result = analyzer.analyze_text(os.path.basename(path), None)
+            finished = time.perf_counter()
+    except Exception as e:
+        record.update({
+            'status': 'error',
+            'error': f"{type(e).__name__}: {e}",
+            'timings': {'total_seconds': round(time.perf_counter() - start, 3)},
+        })
+        return record
+
+    if quick:
+        record.update({'partial': result.partial, 'coverage': result.coverage})
+    if result.aborted:
+        record['aborted'] = result.aborted
+    record.update({
+        'status': 'aborted' if result.aborted else 'ok',
+        'financials': result.financials,
+        'quarterly_data': result.quarterly_data,
+        'announcements': result.announcements,
+        'operations': result.operations,
+        'source_pages': result.source_pages,
+        'metrics': result.metrics,
+        'timings': {'total_seconds': round(finished - start, 3)},
+    })
+    if extracted is not None:
+        record['timings'].update({
+            'extract_seconds': round(extracted - start, 3),
+            'analyze_seconds': round(finished - extracted, 3),
+        })
+    return record
+
+
+def record_peak_rss_mb(record):
+    """Peak resident MB of the process behind a record, None when it was not measured"""
+    peaks = [record.get('metrics', {}).get('process_peak_rss_mb'), record.get('aborted', {}).get('peak_rss_mb')]
+    return max(filter(None, peaks), default=None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze financial PDFs in bulk and write JSON lines")
+    parser.add_argument('inputs', nargs='+', help="PDF files, directories or glob patterns")
+    parser.add_argument('-o', '--output', default='results.jsonl', help="JSON lines output file (appended to)")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help="parallel worker processes")
+    parser.add_argument('--no-resume', action='store_true', help="re-analyze documents already in the output")
+    parser.add_argument('--no-cache', action='store_true', help="do not use the extracted-text cache")
+    parser.add_argument('--quick', action='store_true',
+                        help="headline numbers only, within FINSUM_QUICK_PAGES pages and FINSUM_QUICK_SECONDS")
+    parser.add_argument('--backend', choices=TEXT_BACKENDS, default=default_text_backend(),
+                        help="page text backend; pdfium reads non-statement pages much faster (default FINSUM_TEXT_BACKEND)")
+    parser.add_argument('--max-resident-pages', type=int, default=None,
+                        help="reopen each PDF after this many pages to bound memory (default FINSUM_MAX_RESIDENT_PAGES)")
+    parser.add_argument('--time-limit', type=float, default=default_time_limit(),
+                        help="seconds one document may take (default FINSUM_TIME_LIMIT)")
+    parser.add_argument('--memory-limit', type=float, default=default_memory_limit_mb(),
+                        help="MB of resident memory one analysis may use (default FINSUM_MEMORY_LIMIT_MB)")
+    parser.add_argument('--period', help="reporting period of the filings, e.g. 2024-12-31, recorded with each")
+    parser.add_argument('--store', default=os.environ.get("FINSUM_STORE_DIR"),
+                        help="also write results to this Parquet store directory (default FINSUM_STORE_DIR)")
+    args = parser.parse_args(argv)
+
+    paths = find_pdfs(args.inputs)
+    if not paths:
+        sys.exit("❌ No PDF files found")
+
+    mode = 'quick' if args.quick else 'full'
+    done = set() if args.no_resume else completed_digests(args.output, mode)
+    pending = []
+    for path in paths:
+        digest = file_digest(path)
+        if digest not in done:
+            pending.append((path, digest))
+            done.add(digest)
+    print(f"📂 {len(paths)} PDFs found, {len(paths) - len(pending)} already done or duplicates, "
+          f"{len(pending)} to analyze", file=sys.stderr)
+
+    # A crash can leave a partial last line; start new records on a fresh line
+    if os.path.exists(args.output) and os.path.getsize(args.output):
+        with open(args.output, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+        if needs_newline:
+            with open(args.output, 'a', encoding="utf-8") as out:
+                out.write("\n")
+
+    store = None
+    if args.store:
+        # pandas / pyarrow are only loaded when results are stored
+        from finsum.store import FilingStore
+        store = FilingStore(args.store)
+    failures = aborted = 0
+    peak_rss_mb = None
+    with open(args.output, 'a', encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=max(1, args.max_workers)) as pool:
+        limits = (args.time_limit, args.memory_limit) if args.time_limit or args.memory_limit else None
+        futures = [pool.submit(analyze_file, path, digest, not args.no_cache, args.quick, args.period, limits,
+                               args.backend, args.max_resident_pages)
+                   for path, digest in pending]
+        for count, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if record['status'] == 'error':
+                failures += 1
+            elif record['status'] == 'aborted':
+                aborted += 1
+            elif store is not None:
+                store.put(record, record['sha256'])
+            peak_mb = record_peak_rss_mb(record)
+            if peak_mb is not None:
+                peak_rss_mb = max(peak_rss_mb or 0.0, peak_mb)
+            memory = f"{peak_mb:>7.0f} MB " if peak_mb is not None else ""
+            print(f"[{count}/{len(pending)}] {record['status']:<5} {record['timings']['total_seconds']:>7.1f}s "
+                  f"{memory}{os.path.basename(record['path'])}", file=sys.stderr)
+
+    print(f"✅ {len(pending) - failures - aborted} analyzed, {aborted} aborted at a limit, {failures} failed "
+          f"-> {args.output}", file=sys.stderr)
+    if peak_rss_mb is not None:
+        print(f"📈 Largest peak RSS of a worker process: {peak_rss_mb:.0f} MB", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Compare the per-pattern and sentence-indexed announcement extraction.
+
+Usage:
+    python benchmarks/announcement_benchmark.py [pdf_path] [--repeat N]
+
+The document text is repeated N times to approximate a large annual report
+(the 33-page sample repeated 12 times is roughly 400 pages). Snippet rules
+are matched within sentences, so counts can differ from the per-pattern run
+where a match used to run across sentence boundaries.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finsum import ComprehensiveFinancialAnalyzer
+from finsum.rules import ANNOUNCEMENT_RULES
+
+
+def legacy_announcements(analyzer, text):
+    """Original behaviour: one full re.finditer pass per pattern"""
+    announcements = {category: [] for category, _, _, _ in ANNOUNCEMENT_RULES}
+    for category, pattern, flags, template in ANNOUNCEMENT_RULES:
+        for match in re.finditer(pattern, text, flags):
+            if template:
+                announcements[category].append(template.format(match.group(1)))
+            else:
+                clean_text = analyzer.clean_announcement_text(match.group(1).strip())
+                if clean_text:
+                    announcements[category].append(clean_text)
+    return announcements
+
+
+def best_time(func, runs):
+    best = float('inf')
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pdf_path', nargs='?', default=os.path.join('sample_reports', 'adani.pdf'))
+    parser.add_argument('--repeat', type=int, default=12, help="times to repeat the document text")
+    parser.add_argument('--runs', type=int, default=3, help="timed runs, best is reported")
+    args = parser.parse_args()
+
+    analyzer = ComprehensiveFinancialAnalyzer()
+    text = analyzer.extract_text_comprehensive(args.pdf_path)
+    if not text:
+        sys.exit("❌ Could not read PDF")
+    text = text * args.repeat
+
+    legacy_time, legacy = best_time(lambda: legacy_announcements(analyzer, text), args.runs)
+
+    def indexed():
+        # Fresh analyzer so the sentence index is rebuilt on every run
+        return ComprehensiveFinancialAnalyzer().extract_corporate_announcements(text)
+
+    single_time, single = best_time(indexed, args.runs)
+
+    print(f"\nText size: {len(text):,} characters ({args.repeat}x {os.path.basename(args.pdf_path)})")
+    print(f"{'Engine':<14}{'Full passes':>12}{'Wall time':>12}{'Found':>8}")
+    print(f"{'per-pattern':<14}{len(ANNOUNCEMENT_RULES):>12}{legacy_time:>11.3f}s"
+          f"{sum(len(items) for items in legacy.values()):>8}")
+    print(f"{'indexed':<14}{1:>12}{single_time:>11.3f}s"
+          f"{sum(len(items) for items in single.values()):>8}")
+    print(f"Speedup: {legacy_time / single_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare the page text backends on speed and on what the analysis finds.
+
+Usage:
+    python benchmarks/backend_benchmark.py [pdf_path] [--runs 3]
+
+Every backend extracts the document with the cache off (best of N runs),
+then the extractors run on its text. Accuracy is reported against
+pdfplumber: the word overlap of the page texts, whether the financial
+figures match, and the announcements / operations found by only one side.
+"""
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finsum import ComprehensiveFinancialAnalyzer
+
+BACKENDS = ['pdfplumber', 'pdfium']
+WORD = re.compile(r"\w+")
+
+
+def run_backend(pdf_path, backend, runs):
+    """(best extraction seconds, page texts, result, metrics) of one backend"""
+    best = float('inf')
+    for _ in range(runs):
+        analyzer = ComprehensiveFinancialAnalyzer(workers=1, cache=False, backend=backend)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            text = analyzer.extract_text_comprehensive(pdf_path)
+            best = min(best, time.perf_counter() - start)
+    if not text:
+        sys.exit(f"❌ {backend} could not read {pdf_path}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = analyzer.analyze_text(os.path.basename(pdf_path), text)
+    return best, list(analyzer.text_store), result
+
+
+def word_overlap(a, b):
+    """Jaccard similarity of the word sets of two texts"""
+    words_a, words_b = set(WORD.findall(a.lower())), set(WORD.findall(b.lower()))
+    if not words_a and not words_b:
+        return 1.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pdf_path', nargs='?', default=os.path.join('sample_reports', 'adani.pdf'))
+    parser.add_argument('--runs', type=int, default=3, help="timed extractions per backend, best is reported")
+    args = parser.parse_args()
+
+    runs = {backend: run_backend(args.pdf_path, backend, args.runs) for backend in BACKENDS}
+    baseline_seconds, baseline_pages, baseline = runs['pdfplumber']
+
+    print(f"\n📄 {args.pdf_path}: {len(baseline_pages)} pages\n")
+    print(f"{'Backend':<12}{'Extract (s)':>12}{'Speedup':>9}{'Pdfplumber pages':>18}{'Characters':>12}"
+          f"{'Word overlap':>14}")
+    for backend, (seconds, pages, result) in runs.items():
+        stages = result.metrics['stages']
+        plumber_pages = stages.get('page_text', {}).get('items', {}).get('pages', 0)
+        overlap = sum(word_overlap(a, b) for a, b in zip(baseline_pages, pages)) / max(1, len(pages))
+        print(f"{backend:<12}{seconds:>12.3f}{baseline_seconds / seconds:>8.1f}x{plumber_pages:>18}"
+              f"{sum(len(page) for page in pages):>12,}{overlap:>13.1%}")
+
+    for backend, (_, _, result) in runs.items():
+        if backend == 'pdfplumber':
+            continue
+        print(f"\n🔎 {backend} vs pdfplumber")
+        print(f"  financials match: {result.financials == baseline.financials}")
+        print(f"  quarterly data match: {result.quarterly_data == baseline.quarterly_data}")
+        for field_name in ('announcements', 'operations'):
+            before, after = getattr(baseline, field_name), getattr(result, field_name)
+            for category in before:
+                only_before = set(before[category]) - set(after.get(category, []))
+                only_after = set(after.get(category, [])) - set(before[category])
+                if only_before or only_after:
+                    print(f"  {field_name}.{category}: {len(before[category])} -> {len(after.get(category, []))} "
+                          f"({len(only_before)} only with pdfplumber, {len(only_after)} only with {backend})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Measure how long the engine takes to import compared to the UI dependencies.
+
+Usage:
+    python benchmarks/import_benchmark.py [--runs 5]
+
+Every import runs in a fresh interpreter, so nothing is already loaded;
+the best of N runs is reported.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("engine", "from finsum import ComprehensiveFinancialAnalyzer"),
+    ("worker", "import finsum.page_extraction"),
+    ("pdfplumber", "import pdfplumber"),
+    ("streamlit", "import streamlit"),
+    ("streamlit + pdfplumber", "import streamlit, pdfplumber"),
+]
+
+TIMER = "import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+
+
+def import_seconds(statement):
+    output = subprocess.run([sys.executable, "-c", TIMER.format(statement=statement)], cwd=REPO_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare import times of the engine and the UI dependencies")
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters per import, best is reported")
+    args = parser.parse_args()
+
+    print(f"{'Import':<24}{'Best (ms)':>10}  Statement")
+    for name, statement in CASES:
+        best = min(import_seconds(statement) for _ in range(args.runs))
+        print(f"{name:<24}{best * 1000:>10.1f}  {statement}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Rank the engine's regex patterns by the time they take on a document.
+
+Usage:
+    python benchmarks/pattern_profile.py [pdf_path] [--repeat N] [--limit 30]
+    FINSUM_REGEX_TIMEOUT=0.5 python benchmarks/pattern_profile.py   # regex package with timeouts
+
+The text is extracted once; the counters are then reset so the report
+covers the extractors on the (optionally repeated) text only. Patterns
+marked ∅ never matched.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finsum import ComprehensiveFinancialAnalyzer
+from finsum.patterns import PATTERNS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pdf_path', nargs='?', default=os.path.join('sample_reports', 'adani.pdf'))
+    parser.add_argument('--repeat', type=int, default=1, help="times to repeat the document text")
+    parser.add_argument('--limit', type=int, default=30, help="patterns listed, costliest first")
+    parser.add_argument('--all', action='store_true', help="list every pattern")
+    args = parser.parse_args()
+
+    analyzer = ComprehensiveFinancialAnalyzer(workers=1, cache=False)
+    text = analyzer.extract_text_comprehensive(args.pdf_path)
+    if not text:
+        sys.exit("❌ Could not read PDF")
+    text = text * args.repeat
+
+    PATTERNS.reset()
+    start = time.perf_counter()
+    analyzer.analyze_text(os.path.basename(args.pdf_path), text)
+    elapsed = time.perf_counter() - start
+
+    engine = PATTERNS.engine.__name__
+    timeout = f", timeout {PATTERNS.timeout}s" if PATTERNS.timeout else ""
+    print(f"\n🔎 {len(text):,} characters analyzed in {elapsed:.3f}s ({engine}{timeout})\n")
+    print(PATTERNS.format_report(None if args.all else args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Benchmark every analysis stage on synthetic filings and the sample report.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 10 100 1000] [--text-only]
+                                        [--output FILE] [--compare OLD.json]
+
+Each case runs in a fresh process so its peak RSS is its own. Extractors
+read only the pages of their sections and the sentence index is built by
+extract_corporate_announcements and reused by extract_business_operations,
+as in a normal analysis. With --text-only the page text store is measured
+too, including its traced peak memory. Results are saved as JSON (by
+default benchmarks/results/benchmark-<commit>.json) and --compare prints
+the per-stage change against an earlier results file.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+SAMPLE_PDF = os.path.join(REPO_DIR, "sample_reports", "adani.pdf")
+
+# (analyzer method, section routing key)
+EXTRACTOR_STAGES = [
+    ('extract_quarterly_financials', 'quarterly_financials'),
+    ('extract_all_financials', 'financials'),
+    ('extract_corporate_announcements', 'announcements'),
+    ('extract_business_operations', 'operations'),
+]
+
+# Slowdown against the compared run that is reported as a regression;
+# stages faster than the noise floor are not compared
+REGRESSION_RATIO = 1.2
+NOISE_FLOOR_SECONDS = 0.01
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def stage_record(seconds, pages, megabytes):
+    return {
+        'seconds': round(seconds, 4),
+        'pages_per_sec': round(pages / seconds, 1) if seconds else None,
+        'mb_per_sec': round(megabytes / seconds, 2) if seconds else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def run_case(name, pages, pdf_path, page_texts, workers):
+    """Time each stage of one document; runs in its own process"""
+    from finsum import ComprehensiveFinancialAnalyzer
+
+    analyzer = ComprehensiveFinancialAnalyzer(workers=workers, cache=False)
+    stages = {}
+
+    if pdf_path:
+        pdf_mb = os.path.getsize(pdf_path) / (1024 * 1024)
+        start = time.perf_counter()
+        text = analyzer.extract_text_comprehensive(pdf_path)
+        stages['extract_text_comprehensive'] = stage_record(time.perf_counter() - start, pages, pdf_mb)
+    else:
+        # Page store, joined text and section routing, with their traced peak memory
+        from finsum.text_store import PageTextStore
+        tracemalloc.start()
+        start = time.perf_counter()
+        analyzer.build_section_index(PageTextStore.from_pages(page_texts))
+        text = analyzer.text_store.text()
+        for _, section_key in EXTRACTOR_STAGES:
+            analyzer.section_text(text, section_key)
+        seconds = time.perf_counter() - start
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        text_mb = len(text.encode("utf-8")) / (1024 * 1024)
+        stages['text_store'] = stage_record(seconds, pages, text_mb)
+        stages['text_store']['traced_peak_mb'] = round(traced_peak / (1024 * 1024), 1)
+
+    text_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    for stage, section_key in EXTRACTOR_STAGES:
+        start = time.perf_counter()
+        getattr(analyzer, stage)(analyzer.section_text(text, section_key))
+        stages[stage] = stage_record(time.perf_counter() - start, pages, text_mb)
+
+    return {
+        'case': name,
+        'pages': pages,
+        'pdf_bytes': os.path.getsize(pdf_path) if pdf_path else None,
+        'text_bytes': len(text.encode("utf-8")),
+        'stages': stages,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def run_isolated(*args):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_case, *args).result()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_case(case):
+    print(f"\n{case['case']} ({case['pages']} pages, {case['text_bytes'] / (1024 * 1024):.2f} MB text, "
+          f"peak RSS {case['peak_rss_mb']:.0f} MB)")
+    print(f"  {'Stage':<34}{'Seconds':>10}{'Pages/s':>10}{'MB/s':>9}")
+    for stage, record in case['stages'].items():
+        print(f"  {stage:<34}{record['seconds']:>10.3f}{record['pages_per_sec'] or 0:>10.1f}"
+              f"{record['mb_per_sec'] or 0:>9.2f}")
+
+
+def compare(previous, current):
+    """Print stage timings against an earlier run and return the number of regressions"""
+    old_cases = {case['case']: case for case in previous['cases']}
+    regressions = 0
+    print(f"\nComparison with {previous['commit']} (regression: >{REGRESSION_RATIO:.1f}x slower)")
+    for case in current['cases']:
+        old_case = old_cases.get(case['case'])
+        if old_case is None:
+            continue
+        for stage, record in case['stages'].items():
+            old = old_case['stages'].get(stage)
+            if not old or max(old['seconds'], record['seconds']) < NOISE_FLOOR_SECONDS:
+                continue
+            ratio = record['seconds'] / old['seconds']
+            flag = ""
+            if ratio > REGRESSION_RATIO:
+                flag = "  ⚠️ regression"
+                regressions += 1
+            print(f"  {case['case']:<16}{stage:<34}{old['seconds']:>9.3f}s -> {record['seconds']:>9.3f}s"
+                  f"  {ratio:>5.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis stages")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help="synthetic page counts")
+    parser.add_argument('--text-only', action='store_true',
+                        help="skip PDF generation and extraction, benchmark the extractors on synthetic text")
+    parser.add_argument('--no-sample', action='store_true', help=f"skip {os.path.basename(SAMPLE_PDF)}")
+    parser.add_argument('--workers', type=int, default=1, help="page extraction workers")
+    parser.add_argument('--output', help="results JSON path")
+    parser.add_argument('--compare', help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    from synthetic import synthetic_pages, write_pdf
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'workers': args.workers,
+        'cases': [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            name = f"synthetic-{size}"
+            if args.text_only:
+                case = run_isolated(name, size, None, synthetic_pages(size), args.workers)
+            else:
+                pdf_path = os.path.join(tmp, f"{name}.pdf")
+                write_pdf(synthetic_pages(size), pdf_path)
+                case = run_isolated(name, size, pdf_path, None, args.workers)
+            results['cases'].append(case)
+            print_case(case)
+
+        if not args.no_sample and not args.text_only:
+            from pdfplumber import open as open_pdf
+            with open_pdf(SAMPLE_PDF) as pdf:
+                pages = len(pdf.pages)
+            case = run_isolated("adani", pages, SAMPLE_PDF, None, args.workers)
+            results['cases'].append(case)
+            print_case(case)
+
+    output = args.output or os.path.join(BENCH_DIR, "results", f"benchmark-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), results)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
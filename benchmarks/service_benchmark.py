@@ -0,0 +1,104 @@
+"""Load the HTTP analysis service with concurrent uploads.
+
+Usage:
+    python benchmarks/service_benchmark.py [--clients 8] [--uploads 32] [--pages 5]
+                                           [--workers 2] [--max-queued 4] [--url URL]
+
+Without --url a server is started in this process on a free port, so the
+run needs no network. Every upload is a distinct copy of a synthetic
+filing (a comment appended after %%EOF), so none is answered from another
+job. Clients retry on 429 after the Retry-After delay (ServiceClient.analyze);
+the report shows throughput, end-to-end latency and, from /metrics, how many
+uploads were turned away.
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from finsum.client import ServiceClient, ServiceError
+from synthetic import synthetic_pages, write_pdf
+
+
+def upload(client, pdf, index):
+    """Analyze one copy of the PDF; returns (seconds, final status)"""
+    data = pdf + f"\n%upload {index}\n".encode("ascii")
+    start = time.perf_counter()
+    try:
+        job = client.analyze(data, f"upload-{index}.pdf", timeout=600, poll=10)
+        status = job['status']
+    except ServiceError as e:
+        status = f"http {e.status}"
+    return time.perf_counter() - start, status
+
+
+def rejected_uploads(metrics_text):
+    """finsum_uploads_rejected_total from the service's Prometheus text"""
+    for line in metrics_text.splitlines():
+        if line.startswith("finsum_uploads_rejected_total "):
+            return int(float(line.split()[1]))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8, help="uploads in flight at the same time")
+    parser.add_argument('--uploads', type=int, default=32, help="uploads in total")
+    parser.add_argument('--pages', type=int, default=5, help="pages of the synthetic filing")
+    parser.add_argument('--workers', type=int, default=2, help="analyses the started server runs at once")
+    parser.add_argument('--max-queued', type=int, default=4, help="queue limit of the started server")
+    parser.add_argument('--url', help="benchmark a running server instead of starting one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.pdf")
+        write_pdf(synthetic_pages(args.pages), path)
+        with open(path, "rb") as f:
+            pdf = f.read()
+
+    server = None
+    if args.url is None:
+        from finsum.analyzer import ComprehensiveFinancialAnalyzer
+        from finsum.jobs import JobQueue
+        from finsum.server import AnalysisService, start_server
+
+        queue = JobQueue(lambda: ComprehensiveFinancialAnalyzer(cache=False), workers=args.workers,
+                         max_queued=args.max_queued, max_finished=args.uploads)
+        server = start_server(service=AnalysisService(queue))
+    client = ServiceClient(args.url or server.url)
+
+    rejected_before = rejected_uploads(client.metrics())
+    # The analyzer prints its progress; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            runs = list(pool.map(lambda i: upload(client, pdf, i), range(args.uploads)))
+        elapsed = time.perf_counter() - start
+    health = client.health()
+    rejected = rejected_uploads(client.metrics()) - rejected_before
+    if server is not None:
+        server.shutdown()
+
+    latencies = sorted(seconds for seconds, _ in runs)
+    statuses = [status for _, status in runs]
+    print(f"\n🌐 {args.uploads} uploads of a {args.pages}-page filing, {args.clients} clients, "
+          f"{health['workers']} workers, queue limit {health['max_queued']}\n")
+    print(f"  finished:    {statuses.count('done')} done, {statuses.count('failed')} failed, "
+          f"{len(statuses) - statuses.count('done') - statuses.count('failed')} errors")
+    print(f"  throughput:  {args.uploads / elapsed:.2f} analyses/s ({elapsed:.1f}s in total)")
+    print(f"  latency:     p50 {statistics.median(latencies):.2f}s, "
+          f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:.2f}s, max {latencies[-1]:.2f}s")
+    print(f"  429 answers: {rejected}")
+
+
+if __name__ == "__main__":
+    main()
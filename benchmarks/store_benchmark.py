@@ -0,0 +1,89 @@
+"""Fill a results store with mixed records, check every read, and time puts and queries.
+
+Usage:
+    python benchmarks/store_benchmark.py [--companies 20] [--periods 12]
+
+Records come in every shape the store accepts: AnalysisResult.to_dict()
+(page hashes), batch.py full records (no page count), quick records
+(coverage) and documents in which nothing was found (no metric rows). The
+empty ones are stored under the company that sorts first, so their files
+are the first the readers open. Any read that fails or returns the wrong
+rows stops the run with a non-zero exit.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finsum.store import FilingStore
+
+EMPTY_COMPANY = "0-Empty"
+
+
+def record(shape, company, index):
+    """A stored record of one shape with an EPS and a quarterly revenue figure"""
+    eps = f"₹{10 + index}.5"
+    quarterly = {'revenue_from_operations': {'current': 100.0 + index, 'previous_q': 99.0 + index,
+                                             'previous_year': 90.0 + index}}
+    if shape == 'result':
+        return {'filename': f"{company}.pdf", 'financials': {'eps': eps}, 'quarterly_data': quarterly,
+                'page_hashes': ['a'] * 30}
+    if shape == 'batch':
+        return {'path': f"/filings/{company}.pdf", 'mode': 'full', 'financials': {'eps': eps},
+                'quarterly_data': quarterly}
+    return {'path': f"/filings/{company}.pdf", 'mode': 'quick', 'financials': {'eps': eps},
+            'coverage': {'pages_read': 4, 'page_count': 30, 'stop_reason': 'key_metrics'}}
+
+
+def check(condition, message):
+    if not condition:
+        sys.exit(f"❌ {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--companies', type=int, default=20)
+    parser.add_argument('--periods', type=int, default=12)
+    args = parser.parse_args()
+
+    shapes = ['result', 'batch', 'quick']
+    periods = [f"{2022 + q // 4}Q{q % 4 + 1}" for q in range(args.periods)]
+    with tempfile.TemporaryDirectory() as root:
+        store = FilingStore(root)
+        start = time.perf_counter()
+        for period in periods:
+            store.put({'filename': f"{EMPTY_COMPANY}.pdf"}, f"empty-{period}", EMPTY_COMPANY, period)
+        for c in range(args.companies):
+            for q, period in enumerate(periods):
+                store.put(record(shapes[(c + q) % len(shapes)], f"C{c:03d}", q), f"C{c:03d}-{period}",
+                          f"C{c:03d}", period)
+        puts = args.periods * (args.companies + 1)
+        put_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        metrics = store.metrics()
+        documents = store.documents()
+        history = store.history("C000", "eps")
+        read_seconds = time.perf_counter() - start
+
+        check(len(documents) == puts, f"{len(documents)} documents read, {puts} stored")
+        check(EMPTY_COMPANY not in set(metrics['company']), "the empty documents have metric rows")
+        check(len(store.metrics(company=EMPTY_COMPANY)) == 0, "filtering on the empty company failed")
+        check(history['period'].tolist() == periods, "history is missing periods")
+        check(history['current'].tolist() == [10.5 + q for q in range(args.periods)], "history values differ")
+        page_counts = documents.set_index('sha256')['page_count']
+        check(page_counts.isna().sum() == args.periods + sum(
+            shapes[(c + q) % len(shapes)] == 'batch' for c in range(args.companies) for q in range(args.periods)
+        ), "page counts of batch records or empty documents were not left empty")
+        check(store.get(f"empty-{periods[0]}")['page_count'] is None, "get() of an empty document failed")
+
+    print(f"✅ {puts} documents ({', '.join(shapes)} records and empty ones): "
+          f"{put_seconds / puts * 1000:.1f} ms per put, "
+          f"{len(metrics):,} metric rows + documents + one history read in {read_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Synthetic financial filings for benchmarking.
+
+Pages mix results statements (P&L lines with current, previous quarter and
+previous year columns) and narrative pages with announcement phrases.
+write_pdf lays the same pages out as a plain PDF, so PDF extraction and the
+text extractors see the same content.
+"""
+import random
+
+LINES_PER_PAGE = 60
+
+STATEMENT_LINES = [
+    "Revenue from operations {a} {b} {c}",
+    "Other income {a} {b} {c}",
+    "Total Income (I+II) {a} {b} {c}",
+    "Fuel cost {a} {b} {c}",
+    "Employee benefits expense {a} {b} {c}",
+    "Finance costs {a} {b} {c}",
+    "Depreciation and amortisation expense {a} {b} {c}",
+    "Total expenses (IV) {a} {b} {c}",
+    "Profit before tax (III-IV) {a} {b} {c}",
+    "Tax expense {a} {b} {c}",
+    "Profit for the period (V-VI) {a} {b} {c}",
+    "EBITDA {a} {b} {c}",
+    "Basic & Diluted EPS (Amount in INR) {eps} {eps2} {eps3}",
+    "Borrowings {a} {b} {c}",
+]
+
+ANNOUNCEMENT_SENTENCES = [
+    "The Board of Directors has recommended a final dividend of ₹ {small} per share for the financial year.",
+    "The Board approved fund raising of up to ₹ {amount} crore through a qualified institutional placement.",
+    "The Company acquired a 100% stake in {company} for an enterprise value of ₹ {amount} crore.",
+    "The Hon'ble National Company Law Tribunal, Ahmedabad bench approved the scheme of amalgamation of {company}.",
+    "A legal case filed by a supplier regarding disputed fuel charges is pending before the High Court.",
+    "The arbitration proceedings with the state distribution utility concluded in favour of the Company.",
+    "CERC approved the tariff petition for compensation towards change in law events for {company}.",
+    "The Company commissioned {mw} MW of new capacity at its {site} thermal power project during the quarter.",
+    "Mr. {person} was appointed as an Independent Director of the Company with effect from the board meeting date.",
+    "Mr. {person} resigned as Chief Executive Officer due to personal reasons after a long tenure.",
+    "The environmental clearance for the {site} expansion project was received from the Ministry.",
+    "CRISIL upgraded the long term credit rating of the Company to AA+ with a stable outlook.",
+    "The order book stood at ₹ {amount} crore as on the reporting date with new orders from utilities.",
+    "Power generation during the quarter was {bu} BU with a plant load factor of {plf}%.",
+    "Industry demand for electricity grew strongly on the back of economic growth and weather conditions.",
+]
+
+FILLER_SENTENCES = [
+    "The financial results have been prepared in accordance with Indian Accounting Standards.",
+    "Figures for the previous periods have been regrouped wherever necessary to conform to current classification.",
+    "The statutory auditors have carried out a limited review of the results for the quarter.",
+    "Segment information is provided on the basis of the internal reports reviewed by the chief operating decision maker.",
+    "All amounts are in crore unless otherwise stated and rounded off to two decimals.",
+]
+
+COMPANIES = ["Stratatech Mineral Resources Pvt Ltd", "Moxie Power Generation Ltd", "Coastal Energen Pvt Ltd",
+             "Lanco Amarkantak Power Ltd", "Korba Power Ltd"]
+SITES = ["Godda", "Mundra", "Tiroda", "Kawai", "Udupi", "Raipur"]
+PEOPLE = ["A. Sharma", "R. Mehta", "S. Iyer", "P. Nair", "K. Desai"]
+
+
+def amount(rng, low=1000, high=60000):
+    return f"{rng.uniform(low, high):,.2f}"
+
+
+def statement_page(rng, page_number):
+    lines = [f"Statement of Profit and Loss for the quarter ended (page {page_number})",
+             "Particulars Quarter ended Previous quarter Corresponding quarter"]
+    while len(lines) < LINES_PER_PAGE:
+        for template in STATEMENT_LINES:
+            eps = rng.uniform(1, 50)
+            lines.append(template.format(a=amount(rng), b=amount(rng), c=amount(rng),
+                                         eps=f"{eps:.2f}", eps2=f"{eps * 0.9:.2f}", eps3=f"{eps * 0.8:.2f}"))
+    return lines[:LINES_PER_PAGE]
+
+
+def narrative_page(rng, page_number):
+    lines = [f"Directors' Report and Press Release (page {page_number})"]
+    while len(lines) < LINES_PER_PAGE:
+        if rng.random() < 0.4:
+            sentence = rng.choice(ANNOUNCEMENT_SENTENCES).format(
+                small=f"{rng.uniform(1, 20):.2f}", amount=amount(rng), company=rng.choice(COMPANIES),
+                mw=f"{rng.randrange(100, 5000):,}", site=rng.choice(SITES), person=rng.choice(PEOPLE),
+                bu=f"{rng.uniform(5, 30):.1f}", plf=f"{rng.uniform(50, 90):.1f}")
+        else:
+            sentence = rng.choice(FILLER_SENTENCES)
+        lines.extend(wrap(sentence, 95))
+    return lines[:LINES_PER_PAGE]
+
+
+def wrap(sentence, width):
+    lines = []
+    line = ""
+    for word in sentence.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    lines.append(line)
+    return lines
+
+
+def synthetic_pages(page_count, seed=0):
+    """Page texts of a synthetic filing, one results statement page in every five"""
+    rng = random.Random(seed)
+    return ["\n".join(statement_page(rng, i + 1) if i % 5 == 0 else narrative_page(rng, i + 1))
+            for i in range(page_count)]
+
+
+def synthetic_text(page_count, seed=0):
+    """Text as extract_text_comprehensive returns it for the synthetic filing"""
+    return "".join(page + "\n" for page in synthetic_pages(page_count, seed))
+
+
+def pdf_string(line):
+    """Encode a line as a PDF literal string
+
+    ₹ is written as byte 128 (€ in cp1252), which the font encoding maps
+    back to ₹ through its /Differences entry.
+    """
+    data = line.replace("₹", "€").encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def write_pdf(pages, path):
+    """Write page texts as a minimal PDF with one Helvetica text block per page"""
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+               b"/Encoding << /Type /Encoding /BaseEncoding /WinAnsiEncoding /Differences [128 /uni20B9] >> >>")
+    pages_id = add(None)
+    page_ids = []
+    for text in pages:
+        stream = b"BT /F1 9 Tf 11 TL 40 800 Td\n"
+        stream += b"".join(pdf_string(line) + b" Tj T*\n" for line in text.split("\n"))
+        stream += b"ET"
+        content = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+                            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+                            % (pages_id, font, content)))
+    objects[pages_id - 1] = (b"<< /Type /Pages /Count %d /Kids [%s] >>"
+                             % (len(page_ids), b" ".join(b"%d 0 R" % i for i in page_ids)))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    with open(path, "wb") as f:
+        f.write(out)
@@ -0,0 +1,29 @@
+"""FinSum analysis engine, importable without Streamlit.
+
+Submodules are imported on first use, so a worker process that only needs
+finsum.page_extraction does not load the extractors, and nothing here
+imports pdfplumber until a PDF is opened.
+"""
+import importlib
+
+_EXPORTS = {
+    'ComprehensiveFinancialAnalyzer': 'analyzer',
+    'AnalysisResult': 'analyzer',
+    'AnalysisMetrics': 'metrics',
+    'PDFTextCache': 'text_cache',
+    'PageTextStore': 'text_store',
+    'diff_results': 'revisions',
+    'metrics_frame': 'frame',
+    'FilingStore': 'store',
+    'ServiceClient': 'client',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,848 @@
+"""The analysis engine: page extraction, the extractors and the plain-text report."""
+import os
+import re
+import time
+from contextlib import closing
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from itertools import chain
+
+from .dedup import TopSnippets, default_top_k
+from .metrics import AnalysisMetrics, timed
+from .page_extraction import (
+    default_max_resident_pages, default_text_backend, default_workers, extract_page, fast_text,
+    iter_document_pages, iter_pages_parallel, resolve_text_backend,
+)
+from .patterns import PATTERNS
+from .revisions import diff_results, page_hashes
+from .rules import ANNOUNCEMENT_RULES, FINANCIAL_PATTERNS, OPERATION_RULES, QUARTERLY_PATTERNS
+from .scanner import SentenceIndex, TEXT_SCANNER
+from .sections import EXTRACTOR_SECTIONS, SectionIndex, page_section
+from .sources import as_source, source_name, spooled
+from .text_cache import default_cache, file_digest
+from .text_store import PageTextStore, page_of
+
+QUARTERLY_REGEXES = {
+    metric: [PATTERNS.compile(pattern, re.IGNORECASE, group=f'quarterly.{metric}') for pattern in patterns]
+    for metric, patterns in QUARTERLY_PATTERNS.items()
+}
+FINANCIAL_REGEXES = [
+    (PATTERNS.compile(pattern, re.IGNORECASE, group=f'financials.{metric}'), metric)
+    for pattern, metric in FINANCIAL_PATTERNS
+]
+WHITESPACE = PATTERNS.compile(r'\s+', group='clean_announcement_text')
+SPACE_BEFORE_PUNCTUATION = PATTERNS.compile(r'\s+([.,;:])', group='clean_announcement_text')
+
+# AnalysisResult field, extractor method and the section it reads, in the order analyze_text runs them
+ANALYSIS_STAGES = [
+    ('financials', 'extract_all_financials', 'financials'),
+    ('quarterly_data', 'extract_quarterly_financials', 'quarterly_financials'),
+    ('announcements', 'extract_corporate_announcements', 'announcements'),
+    ('operations', 'extract_business_operations', 'operations'),
+]
+
+# Headline numbers and the quarterly row that also gives each one; a quick
+# analysis stops reading once all of them are found
+KEY_METRICS = {
+    'revenue': 'revenue',
+    'pat': 'profit_for_period',
+    'pbt': 'profit_before_tax',
+    'ebitda': None,
+    'eps': 'eps',
+}
+KEY_QUARTERLY_METRICS = tuple(row for row in KEY_METRICS.values() if row)
+QUICK_STOP_REASONS = {
+    'key_metrics': "stopped once all key metrics were found",
+    'page_limit': "stopped at the page limit",
+    'time_budget': "stopped at the time budget",
+    'end_of_document': "read to the end",
+}
+
+
+def missing_key_metrics(financials, quarterly_data):
+    """Key metrics found neither in the financials nor as their quarterly row"""
+    return [metric for metric, row in KEY_METRICS.items()
+            if metric not in financials and row not in quarterly_data]
+
+
+def default_quick_pages():
+    """Page limit of a quick analysis from FINSUM_QUICK_PAGES"""
+    try:
+        return max(1, int(os.environ.get("FINSUM_QUICK_PAGES", "10")))
+    except ValueError:
+        return 10
+
+
+def default_quick_seconds():
+    """Wall-clock budget of a quick analysis from FINSUM_QUICK_SECONDS"""
+    try:
+        return max(0.0, float(os.environ.get("FINSUM_QUICK_SECONDS", "1.0")))
+    except ValueError:
+        return 1.0
+
+
+def default_preview_seconds():
+    """Least time between two page previews of analyze_incremental from FINSUM_PREVIEW_SECONDS"""
+    try:
+        return max(0.0, float(os.environ.get("FINSUM_PREVIEW_SECONDS", "1.0")))
+    except ValueError:
+        return 1.0
+
+
+@dataclass
+class AnalysisResult:
+    """Everything extracted from one document; each extractor runs once to fill it"""
+    filename: str
+    financials: dict = field(default_factory=dict)
+    quarterly_data: dict = field(default_factory=dict)
+    announcements: dict = field(default_factory=dict)
+    operations: dict = field(default_factory=dict)
+    financial_tables: list = field(default_factory=list)
+    sections: dict = field(default_factory=dict)
+    # Page numbers of the hits, shaped like financials / quarterly_data / announcements / operations
+    source_pages: dict = field(default_factory=dict)
+    # Quick analyses: pages read, page count and why reading stopped; partial when a limit hit first
+    coverage: dict = field(default_factory=dict)
+    partial: bool = False
+    # SHA-256 of every page text, and the changes from a previous version when one was given
+    page_hashes: list = field(default_factory=list)
+    diff: dict = field(default_factory=dict)
+    # Supervised analyses stopped by a limit: the stage cut short, why, and the limit (see watchdog.py)
+    aborted: dict = field(default_factory=dict)
+    metrics: dict = field(default_factory=dict)
+    report: str = ""
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class ComprehensiveFinancialAnalyzer:
+    def __init__(self, workers=None, cache=None, top_k=None, backend=None, max_resident_pages=None):
+        self.financial_tables = []
+        self.quarterly_data = {}
+        self.text_index = None
+        self.section_index = None
+        self.text_store = None
+        self.hit_pages = {}
+        # Processes used for page extraction, 1 keeps it in this process
+        self.workers = workers if workers is not None else default_workers()
+        # Extracted text cache shared between runs, False disables it
+        if cache is None:
+            cache = default_cache()
+        self.cache = cache or None
+        self.cache_hit = None
+        # Distinct announcements / operations kept per category, most relevant first
+        self.top_k = top_k or default_top_k()
+        # Page text backend: pdfplumber, or pdfium for the pages that are not statements
+        self.backend = resolve_text_backend(backend or default_text_backend())
+        # Pages parsed per opening of the PDF, None reads the whole document in one go
+        self.max_resident_pages = max_resident_pages or default_max_resident_pages()
+        self.metrics = AnalysisMetrics()
+        # Extractor stages of analyze_incremental's per-page previews
+        self.preview_metrics = None
+
+    def options(self):
+        """Constructor arguments that configure another analyzer like this one, e.g. in a supervised subprocess"""
+        return {'workers': self.workers, 'cache': self.cache or False, 'top_k': self.top_k,
+                'backend': self.backend, 'max_resident_pages': self.max_resident_pages}
+
+    def extract_text_comprehensive(self, source):
+        """Fast text extraction with full coverage; source is a PDF path, its bytes or a binary file object"""
+        if not self.read_pages(source):
+            return ""
+        return self.text_store.text()
+
+    def read_pages(self, source):
+        """Parse every page into self.text_store and return the text length, 0 when the PDF could not be read
+
+        Unlike extract_text_comprehensive the pages are not joined; analyze_text(filename, None)
+        then reads them section by section.
+        """
+        print(f"📄 Reading {source_name(source)}...")
+
+        try:
+            for _ in self.iter_pages(source):
+                pass
+        except Exception as e:
+            print(f"❌ PDF extraction failed: {e}")
+            return 0
+
+        print(f"✅ Extracted {self.text_store.text_length:,} characters")
+        return self.text_store.text_length
+
+    def iter_pages(self, source):
+        """Yield (page number, page count, text) as pages are parsed, collecting tables
+
+        Page texts are kept in self.text_store. Documents already in the text
+        cache are replayed without opening them with pdfplumber.
+        """
+        source = as_source(source)
+        if self.text_store is not None:
+            self.text_store.close()
+        self.text_store = PageTextStore()
+        digest, cached = self.lookup_cache(source)
+        if cached is not None:
+            print("📦 Using cached extraction")
+            self.financial_tables.extend(cached['tables'])
+            for text in cached['pages']:
+                self.text_store.append(text)
+            self.build_section_index(self.text_store)
+            page_count = len(cached['pages'])
+            for i, text in enumerate(cached['pages']):
+                yield i + 1, page_count, text
+            return
+
+        first_table = len(self.financial_tables)
+        for page_number, page_count, text in self.parse_pages(source):
+            self.text_store.append(text)
+            yield page_number, page_count, text
+
+        self.build_section_index(self.text_store)
+        if digest is not None:
+            with self.metrics.stage('cache_store'):
+                self.cache.put(digest, list(self.text_store), self.financial_tables[first_table:])
+
+    def lookup_cache(self, source):
+        """(digest, cached pages and tables) of a source; (None, None) without a cache"""
+        if self.cache is None:
+            return None, None
+        with self.metrics.stage('cache_lookup'):
+            digest = file_digest(source)
+            if self.backend != 'pdfplumber':
+                digest = f"{digest}:{self.backend}"
+            cached = self.cache.get(digest)
+        self.cache_hit = cached is not None
+        self.metrics.count('cache_lookup', 'hits' if self.cache_hit else 'misses')
+        return digest, cached
+
+    def iter_text_pages(self, source):
+        """Yield (page number, page count, text) without looking for tables or storing the text
+
+        Cached documents are replayed; others are parsed serially, so closing
+        the generator stops the parsing.
+        """
+        source = as_source(source)
+        digest, cached = self.lookup_cache(source)
+        if cached is not None:
+            page_count = len(cached['pages'])
+            for i, text in enumerate(cached['pages']):
+                yield i + 1, page_count, text
+            return
+
+        memo = {}
+        pages = iter_document_pages(source, self.metrics, self.max_resident_pages)
+        with closing(pages), fast_text(source, self.backend, self.metrics) as reader:
+            for i, page_count, page in pages:
+                text, _ = extract_page(page, self.metrics, self.cache, with_tables=False, memo=memo, reader=reader)
+                yield i + 1, page_count, text
+
+    def parse_pages(self, source):
+        """Parse pages with pdfplumber, in this process or on the worker pool"""
+        memo = {}
+        pages = iter_document_pages(source, self.metrics, self.max_resident_pages)
+        with closing(pages):
+            first = next(pages, None)
+            page_count = first[1] if first else 0
+            parallel = self.workers > 1 and page_count > 1
+            if first and not parallel:
+                with fast_text(source, self.backend, self.metrics) as reader:
+                    for i, page_count, page in chain([first], pages):
+                        text, tables = extract_page(page, self.metrics, self.cache, memo=memo, reader=reader)
+                        self.add_tables(i + 1, tables)
+                        yield i + 1, page_count, text
+
+        if parallel:
+            print(f"⚙️ Extracting {page_count} pages on {self.workers} workers...")
+            # Workers open the PDF by path, so in-memory sources go through a temp file
+            with spooled(source) as pdf_path:
+                pages = iter_pages_parallel(pdf_path, page_count, self.workers, self.metrics, self.cache,
+                                            self.backend, self.max_resident_pages)
+                for i, (text, tables) in enumerate(pages):
+                    self.add_tables(i + 1, tables)
+                    yield i + 1, page_count, text
+
+    def build_section_index(self, store):
+        """Tag every page of a PageTextStore with its section so extractors can skip irrelevant ones"""
+        self.text_store = store
+        self.metrics.count('text_store', 'pages', len(store))
+        self.metrics.count('text_store', 'characters', store.characters)
+        if store.spilled:
+            self.metrics.count('text_store', 'spilled_pages', len(store))
+        with self.metrics.stage('section_index'):
+            self.section_index = SectionIndex(store)
+        for section, count in self.section_index.counts().items():
+            self.metrics.count('section_index', section, count)
+
+    def section_text(self, text, extractor):
+        """The part of the text an extractor reads, when text is the indexed document (or None for it)"""
+        index = self.section_index
+        if index is None or not (text is None or index.store.is_text(text)):
+            return text
+        routed = index.text_for(extractor)
+        self.metrics.count('section_routing', f'{extractor}_characters', len(routed))
+        return routed
+
+    def add_tables(self, page_number, tables):
+        for table in tables:
+            self.financial_tables.append({
+                'page': page_number,
+                'table': table
+            })
+
+    def analyze_incremental(self, source, filename=None, progress=None, preview_seconds=None):
+        """Yield partial results after every page, then the full-document results
+
+        Partial results come from running the extractors on a page as it is
+        parsed, at most once every preview_seconds (FINSUM_PREVIEW_SECONDS;
+        0 previews every page). Pages parsed in between are left out of the
+        previews, so the extractors run on a page twice only for the sampled
+        pages rather than for the whole document. The last update has
+        done=True and carries the AnalysisResult of the whole text, so it
+        matches the non-streaming analysis exactly, and the whole text itself
+        unless the page store spilled (then it is None). progress is passed
+        on to analyze_text.
+
+        The per-page extractor runs are timed as one 'preview' stage; their
+        own stage timings and counts are kept apart in self.preview_metrics,
+        so the extractor stages describe the final analysis only.
+        """
+        financials = {}
+        quarterly_data = {}
+        announcements = {}
+        operations = {}
+        page_count = 0
+        self.preview_metrics = AnalysisMetrics()
+        preview_seconds = default_preview_seconds() if preview_seconds is None else preview_seconds
+        next_preview = 0.0
+
+        for page_number, page_count, text in self.iter_pages(source):
+            if text and time.perf_counter() < next_preview:
+                self.metrics.count('preview', 'skipped_pages')
+            elif text:
+                with self.metrics.stage('preview'):
+                    metrics, self.metrics = self.metrics, self.preview_metrics
+                    try:
+                        for metric, value in self.extract_all_financials(text).items():
+                            financials.setdefault(metric, value)
+                        for metric, value in self.extract_quarterly_financials(text).items():
+                            quarterly_data.setdefault(metric, value)
+                        for category, items in self.extract_corporate_announcements(text).items():
+                            self.merge_preview(announcements.setdefault(category, []), items)
+                        for category, items in self.extract_business_operations(text).items():
+                            self.merge_preview(operations.setdefault(category, []), items)
+                    finally:
+                        self.metrics = metrics
+                self.metrics.count('preview', 'pages')
+                next_preview = time.perf_counter() + preview_seconds
+
+            yield {
+                'done': False,
+                'page': page_number,
+                'page_count': page_count,
+                'financials': financials,
+                'quarterly_data': quarterly_data,
+                'announcements': announcements,
+                'operations': operations,
+            }
+
+        yield {
+            'done': True,
+            'page': page_count,
+            'page_count': page_count,
+            'text': None if self.text_store.spilled else self.text_store.text(),
+            'result': self.analyze_text(filename or source_name(source), None, progress=progress),
+        }
+
+    def analyze_quick(self, source, filename=None, max_pages=None, time_budget=None):
+        """Headline numbers only, reading pages until every key metric is found
+
+        Reading stops at the first of: all KEY_METRICS found, max_pages pages
+        read, time_budget seconds spent. Tables, announcements and operations
+        are skipped. The result is partial when a limit stopped the reading
+        before the key metrics were all found.
+        """
+        max_pages = max_pages or default_quick_pages()
+        time_budget = default_quick_seconds() if time_budget is None else time_budget
+        deadline = time.perf_counter() + time_budget
+        financials = {}
+        quarterly_data = {}
+        source_pages = {'financials': {}, 'quarterly_data': {}}
+        page_number = page_count = 0
+        current = 'other'
+        stop_reason = 'end_of_document'
+
+        with closing(self.iter_text_pages(source)) as pages:
+            for page_number, page_count, text in pages:
+                section, current = page_section(text, current)
+                if text and section in EXTRACTOR_SECTIONS['financials']:
+                    for metric, value in self.extract_all_financials(text, wanted=KEY_METRICS).items():
+                        if metric not in financials:
+                            financials[metric] = value
+                            source_pages['financials'][metric] = page_number
+                if text and section in EXTRACTOR_SECTIONS['quarterly_financials']:
+                    for metric, value in self.extract_quarterly_financials(text, wanted=KEY_QUARTERLY_METRICS).items():
+                        if metric not in quarterly_data:
+                            quarterly_data[metric] = value
+                            source_pages['quarterly_data'][metric] = page_number
+
+                if not missing_key_metrics(financials, quarterly_data):
+                    stop_reason = 'key_metrics'
+                    break
+                if page_number < page_count and page_number >= max_pages:
+                    stop_reason = 'page_limit'
+                    break
+                if page_number < page_count and time.perf_counter() >= deadline:
+                    stop_reason = 'time_budget'
+                    break
+
+        self.metrics.count('quick', 'pages_read', page_number)
+        self.metrics.count('quick', stop_reason)
+        result = AnalysisResult(
+            filename=filename or source_name(source),
+            financials=financials,
+            quarterly_data=quarterly_data,
+            source_pages=source_pages,
+            coverage={'pages_read': page_number, 'page_count': page_count, 'stop_reason': stop_reason},
+            partial=stop_reason in ('page_limit', 'time_budget'),
+        )
+        self.metrics.finish()
+        result.metrics = self.metrics.to_dict()
+        result.report = self.render_report(result)
+        return result
+
+    def merge_preview(self, items, new_items):
+        """Add a page's snippets to a partial result list, keeping it to top_k distinct items"""
+        items.extend(item for item in new_items if item not in items)
+        del items[self.top_k:]
+
+    @timed('quarterly_financials')
+    def extract_quarterly_financials(self, text, wanted=None):
+        """Extract comprehensive quarterly financial data with comparisons
+
+        With wanted, only those metrics are looked for.
+        """
+        quarterly_data = {}
+        pages = {}
+        
+        for metric, pattern_list in QUARTERLY_REGEXES.items():
+            if wanted is not None and metric not in wanted:
+                continue
+            for pattern in pattern_list:
+                match = pattern.search(text)
+                if match:
+                    current_q = self.clean_number(match.group(1))
+                    previous_q = self.clean_number(match.group(2))
+                    previous_year_q = self.clean_number(match.group(3))
+                    
+                    if current_q > 0:
+                        quarterly_data[metric] = {
+                            'current': current_q,
+                            'previous_q': previous_q,
+                            'previous_year': previous_year_q,
+                            'qoq_change': self.calculate_percentage_change(previous_q, current_q),
+                            'yoy_change': self.calculate_percentage_change(previous_year_q, current_q)
+                        }
+                        pages[metric] = page_of(text, match.start())
+                    break
+
+        self.hit_pages['quarterly_data'] = pages
+        self.metrics.count('quarterly_financials', 'metrics', len(quarterly_data))
+        return quarterly_data
+
+    def calculate_percentage_change(self, old_value, new_value):
+        """Calculate percentage change between two values"""
+        if old_value == 0:
+            return 0
+        return ((new_value - old_value) / old_value) * 100
+
+    @timed('financials')
+    def extract_all_financials(self, text, wanted=None):
+        """Comprehensive financial extraction
+
+        With wanted, only those metrics are looked for, stopping once all are found.
+        """
+        financials = {}
+        pages = {}
+
+        for pattern, metric in FINANCIAL_REGEXES:
+            if wanted is not None and metric not in wanted:
+                continue
+            if metric not in financials:
+                match = pattern.search(text)
+                if match:
+                    amount = self.clean_number(match.group(1))
+                    if self.is_valid_amount(metric, amount):
+                        if metric == 'eps':
+                            financials[metric] = f"₹{amount:.2f}"
+                        else:
+                            financials[metric] = f"₹{amount:,.0f} cr"
+                        pages[metric] = page_of(text, match.start())
+                        if wanted is not None and all(key in financials for key in wanted):
+                            break
+
+        self.hit_pages['financials'] = pages
+        self.metrics.count('financials', 'metrics', len(financials))
+        return financials
+
+    @timed('announcements')
+    def extract_corporate_announcements(self, text):
+        """COMPREHENSIVE corporate announcements and updates"""
+        announcements = {
+            'dividends': [],
+            'fund_raising': [],
+            'acquisitions_mergers': [],
+            'appointments': [],
+            'resignations': [],
+            'board_meetings': [],
+            'regulatory_updates': [],
+            'project_announcements': [],
+            'capacity_expansions': [],
+            'new_contracts': [],
+            'legal_cases': [],
+            'disputes': [],
+            'arbitration': [],
+            'regulatory_penalties': [],
+            'environmental_issues': [],
+            'insolvency_cases': [],
+            'credit_rating': []
+        }
+
+        found = {category: TopSnippets(self.top_k) for category in announcements}
+
+        index = self.build_text_index(text)
+        for category, pattern, flags, template in ANNOUNCEMENT_RULES:
+            with self.metrics.stage(f'announcements.{category}'):
+                for offset, match in index.finditer(pattern):
+                    if template:
+                        item = template.format(match.group(1).strip())
+                    else:
+                        item = self.clean_announcement_text(match.group(1).strip())
+                        if not item:
+                            continue
+                    found[category].add(item, *self.match_span(offset, match), page_of(text, offset))
+
+        self.hit_pages['announcements'] = self.collect_snippets(found, announcements, 'announcements')
+        return announcements
+
+    def match_span(self, offset, match):
+        """Span in the text of a rule's captured group, for a match found at offset"""
+        return offset + match.start(1) - match.start(), offset + match.end(1) - match.start()
+
+    def collect_snippets(self, found, results, stage):
+        """Fill results with each category's ranked snippets and return their pages"""
+        pages = {}
+        for category, snippets in found.items():
+            results[category] = snippets.texts()
+            pages[category] = snippets.pages()
+            if results[category]:
+                self.metrics.count(stage, category, len(results[category]))
+        self.metrics.count(stage, 'duplicates', sum(snippets.duplicates for snippets in found.values()))
+        self.metrics.count(stage, 'beyond_top_k', sum(snippets.dropped for snippets in found.values()))
+        return pages
+
+    def build_text_index(self, text):
+        """Split the text into sentences and index keywords once per document"""
+        if self.text_index is None or self.text_index.text != text:
+            with self.metrics.stage('sentence_index'):
+                self.text_index = SentenceIndex(text, TEXT_SCANNER)
+            self.metrics.count('sentence_index', 'sentences', len(self.text_index.starts))
+        return self.text_index
+
+    def clean_announcement_text(self, text):
+        """Clean and format announcement text to remove broken sentences"""
+        # Remove line breaks within sentences and clean up text
+        text = WHITESPACE.sub(' ', text)  # Replace multiple spaces with single space
+        text = SPACE_BEFORE_PUNCTUATION.sub(r'\1', text)  # Remove spaces before punctuation
+        text = text.strip()
+        
+        # Capitalize first letter
+        if text and len(text) > 1:
+            text = text[0].upper() + text[1:]
+        
+        return text if len(text) >= 10 else None  # Filter out very short fragments
+
+    @timed('operations')
+    def extract_business_operations(self, text):
+        """Business operations and performance metrics"""
+        operations = {
+            'orderbook': [],
+            'new_orders': [],
+            'operational_metrics': [],
+            'market_updates': [],
+            'client_announcements': [],
+            'technology_updates': []
+        }
+
+        found = {category: TopSnippets(self.top_k) for category in operations}
+
+        index = self.build_text_index(text)
+        for category, pattern, flags, template in OPERATION_RULES:
+            for offset, match in index.finditer(pattern):
+                item = template.format(match.group(1).strip())
+                found[category].add(item, *self.match_span(offset, match), page_of(text, offset))
+
+        self.hit_pages['operations'] = self.collect_snippets(found, operations, 'operations')
+        return operations
+
+    def clean_number(self, num_str):
+        """Clean number string"""
+        try:
+            return float(num_str.replace(',', ''))
+        except:
+            return 0
+
+    def is_valid_amount(self, metric, amount):
+        """Validate amount ranges"""
+        if amount <= 0:
+            return False
+
+        ranges = {
+            'revenue': (10, 10000000),
+            'pat': (1, 1000000),
+            'pbt': (1, 1000000),
+            'ebitda': (1, 1000000),
+            'eps': (0.01, 10000),
+            'fuel_cost': (10, 500000),
+            'employee_cost': (10, 500000),
+            'total_debt': (10, 5000000)
+        }
+
+        return ranges.get(metric, (1, 10000000))[0] <= amount <= ranges.get(metric, (1, 10000000))[1]
+
+    def analyze_text(self, filename, text, previous=None, progress=None):
+        """Run every extractor once and render the report from the results
+
+        text None is the document in self.text_store: each extractor reads
+        the pages of its sections, and the pages are joined as a whole only
+        for an extractor none of whose sections were found. previous is the
+        result (or its to_dict()) of an earlier version of the document;
+        result.diff then lists what changed. progress is called as
+        progress(field, value) after each of ANALYSIS_STAGES.
+        """
+        print(f"\n🔍 COMPREHENSIVE ANALYSIS: {filename}")
+        print("=" * 70)
+
+        # EXTRACT ALL DATA
+        result = AnalysisResult(filename=filename)
+        for field_name, extractor, section in ANALYSIS_STAGES:
+            value = getattr(self, extractor)(self.section_text(text, section))
+            setattr(result, field_name, value)
+            if progress is not None:
+                progress(field_name, value)
+        result.financial_tables = list(self.financial_tables)
+        result.source_pages = dict(self.hit_pages)
+        if self.section_index is not None and (text is None or self.section_index.store.is_text(text)):
+            result.sections = self.section_index.counts()
+            result.page_hashes = page_hashes(self.text_store)
+        if previous is not None:
+            result.diff = diff_results(previous, result)
+        if self.text_store is not None and self.text_store.spilled:
+            # A spilled document keeps no text copies once it is analyzed
+            self.text_index = None
+            if self.section_index is not None:
+                self.section_index.routed.clear()
+        self.metrics.finish()
+        result.metrics = self.metrics.to_dict()
+        result.report = self.render_report(result)
+        return result
+
+    def generate_comprehensive_report(self, filename, text):
+        """Generate comprehensive report covering everything"""
+        return self.analyze_text(filename, text).report
+
+    def render_report(self, result):
+        """Format an AnalysisResult as the plain-text report"""
+        filename = result.filename
+        financials = result.financials
+        announcements = result.announcements
+        operations = result.operations
+
+        report = []
+        report.append("🚀 COMPREHENSIVE FINANCIAL ANALYZER - ALL PATTERNS COVERED")
+        report.append("=" * 70)
+        report.append(f"Document: {filename}")
+        report.append(f"Analysis: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        coverage = result.coverage
+        if coverage:
+            report.append(f"Mode: quick, {coverage['pages_read']} of {coverage['page_count']} pages read "
+                          f"({QUICK_STOP_REASONS[coverage['stop_reason']]})")
+            if result.partial:
+                missing = ", ".join(metric.upper() for metric in missing_key_metrics(financials, result.quarterly_data))
+                report.append(f"⚠️ PARTIAL RESULT: not found within the limit: {missing}")
+        aborted = result.aborted
+        if aborted:
+            report.append(f"⚠️ PARTIAL RESULT: stopped during {aborted['stage']} ({aborted['message']}); "
+                          f"completed: {', '.join(aborted['completed']) or 'nothing'}")
+        report.append("")
+
+        # EXECUTIVE SUMMARY
+        report.append("📊 EXECUTIVE SUMMARY")
+        report.append("-" * 20)
+
+        # Financial Summary
+        if financials:
+            report.append("\n💰 FINANCIAL PERFORMANCE:")
+            key_metrics = ['revenue', 'pat', 'pbt', 'ebitda', 'eps']
+            for metric in key_metrics:
+                if metric in financials:
+                    name = metric.upper().replace('_', ' ')
+                    report.append(f"  • {name}: {financials[metric]}")
+
+        # Key Announcements Summary
+        key_announcements = []
+        for category in ['dividends', 'fund_raising', 'acquisitions_mergers', 'legal_cases']:
+            if announcements.get(category):
+                key_announcements.extend(announcements[category][:1])
+
+        if key_announcements:
+            report.append("\n🏛️ KEY ANNOUNCEMENTS:")
+            for announcement in key_announcements[:3]:
+                report.append(f"  • {announcement}")
+
+        # DETAILED SECTIONS
+        report.append("\n" + "="*70)
+        report.append("📈 DETAILED FINANCIAL ANALYSIS")
+        report.append("="*70)
+
+        if financials:
+            for metric, value in financials.items():
+                display_name = metric.replace('_', ' ').title()
+                report.append(f"• {display_name}: {value}")
+        else:
+            report.append("No financial data extracted")
+
+        # CORPORATE ANNOUNCEMENTS DETAILS
+        if coverage:
+            # Quick analyses only look for the headline numbers
+            if result.metrics:
+                report.append(f"\n• Processing Time: {result.metrics['elapsed_seconds']:.2f}s wall, "
+                              f"{result.metrics['cpu_seconds']:.2f}s CPU")
+                if result.metrics.get('process_peak_rss_mb'):
+                    report.append(f"• Peak Memory: {result.metrics['process_peak_rss_mb']:.0f} MB resident (process-wide)")
+            return "\n".join(report)
+
+        report.append("\n" + "="*70)
+        report.append("🏛️ CORPORATE ANNOUNCEMENTS & UPDATES")
+        report.append("="*70)
+
+        announcement_categories = [
+            ('💰 Dividends & Distributions', 'dividends'),
+            ('💸 Fund Raising', 'fund_raising'),
+            ('🏢 M&A Activities', 'acquisitions_mergers'),
+            ('👥 Management Changes', 'appointments'),
+            ('📋 Board Meetings', 'board_meetings'),
+            ('⚖️ Legal Cases & Disputes', 'legal_cases'),
+            ('🔧 Regulatory Updates', 'regulatory_updates'),
+            ('🏗️ Projects & Expansions', 'project_announcements'),
+            ('🌱 Environmental Matters', 'environmental_issues'),
+            ('📊 Credit Ratings', 'credit_rating')
+        ]
+
+        announcements_found = False
+        for category_name, category_key in announcement_categories:
+            if announcements.get(category_key):
+                report.append(f"\n{category_name}:")
+                for item in announcements[category_key][:3]:
+                    report.append(f"  • {item}")
+                announcements_found = True
+
+        if not announcements_found:
+            report.append("No corporate announcements detected")
+
+        # BUSINESS OPERATIONS
+        report.append("\n" + "="*70)
+        report.append("🚀 BUSINESS OPERATIONS & PERFORMANCE")
+        report.append("="*70)
+
+        operations_found = False
+        for category, items in operations.items():
+            if items:
+                report.append(f"\n{category.replace('_', ' ').title()}:")
+                for item in items[:3]:
+                    report.append(f"  • {item}")
+                operations_found = True
+
+        if not operations_found:
+            report.append("No business operations data extracted")
+
+        # EXTRACTION STATISTICS
+        report.append("\n" + "="*70)
+        report.append("📊 EXTRACTION SUMMARY")
+        report.append("="*70)
+
+        total_financials = len(financials)
+        total_announcements = sum(len(items) for items in announcements.values())
+        total_operations = sum(len(items) for items in operations.values())
+
+        report.append(f"• Financial Metrics: {total_financials}")
+        report.append(f"• Corporate Announcements: {total_announcements}")
+        report.append(f"• Business Operations: {total_operations}")
+        report.append(f"• Total Data Points: {total_financials + total_announcements + total_operations}")
+        if result.sections:
+            sections = ", ".join(f"{count} {section.replace('_', ' ')}" for section, count in result.sections.items())
+            report.append(f"• Pages by Section: {sections}")
+        metrics = result.metrics
+        if metrics:
+            report.append(f"• Processing Time: {metrics['elapsed_seconds']:.2f}s wall, "
+                          f"{metrics['cpu_seconds']:.2f}s CPU")
+            if metrics.get('process_peak_rss_mb'):
+                workers = f", {metrics['worker_peak_rss_mb']:.0f} MB per worker" if metrics.get('worker_peak_rss_mb') else ""
+                report.append(f"• Peak Memory: {metrics['process_peak_rss_mb']:.0f} MB resident (process-wide){workers}")
+
+        quality_score = total_financials + total_announcements + total_operations
+        if quality_score >= 20:
+            quality = "EXCELLENT"
+        elif quality_score >= 10:
+            quality = "GOOD"
+        elif quality_score >= 5:
+            quality = "BASIC"
+        else:
+            quality = "LIMITED"
+
+        report.append(f"• Data Quality: {quality}")
+
+        # CHANGES SINCE THE PREVIOUS VERSION
+        diff = result.diff
+        if diff:
+            report.append("\n" + "="*70)
+            report.append("🔄 CHANGES SINCE PREVIOUS VERSION")
+            report.append("="*70)
+            pages = ", ".join(str(page) for page in diff['changed_pages']) or "none"
+            report.append(f"• Changed Pages: {pages} ({diff['page_count']['before']} → {diff['page_count']['after']} pages)")
+            for metric, change in diff['financials'].items():
+                report.append(f"• {metric.replace('_', ' ').title()}: {change['before'] or '-'} → {change['after'] or '-'}")
+            for metric, change in diff['quarterly_data'].items():
+                unit = "" if metric == 'eps' else " cr"
+                before, after = (f"₹{change[side]['current']:,.2f}{unit}" if change[side] else "-"
+                                 for side in ('before', 'after'))
+                report.append(f"• {metric.replace('_', ' ').title()} (quarter): {before} → {after}")
+            for section in ('announcements', 'operations'):
+                for category, change in diff[section].items():
+                    name = category.replace('_', ' ').title()
+                    report.extend(f"  + {name}: {item}" for item in change['added'][:3])
+                    report.extend(f"  - {name}: {item}" for item in change['removed'][:3])
+
+        # STAGE TIMINGS
+        if metrics:
+            report.append("\n" + "="*70)
+            report.append("⏱️ STAGE TIMINGS")
+            report.append("="*70)
+            for name, stage in metrics['stages'].items():
+                items = ", ".join(f"{count} {item}" for item, count in stage['items'].items())
+                label = f"  ◦ {name.split('.', 1)[1]}" if '.' in name else f"• {name}"
+                line = f"{label}: {stage['wall_seconds']:.3f}s wall, {stage['cpu_seconds']:.3f}s CPU"
+                report.append(f"{line} ({items})" if items else line)
+
+        return "\n".join(report)
+
+    def analyze_pdf_comprehensive(self, source, previous=None):
+        """Main comprehensive analysis; previous is the result of an earlier version to diff against"""
+        if not self.read_pages(source):
+            print("❌ Could not read PDF")
+            return
+
+        result = self.analyze_text(source_name(source), None, previous)
+
+        print(result.report)
+        print(f"\n⏱️  Comprehensive analysis completed in {result.metrics['elapsed_seconds']:.1f} seconds!")
+        return result
@@ -0,0 +1,111 @@
+"""Client of the HTTP analysis service (finsum.server), on urllib only.
+
+    client = ServiceClient("http://127.0.0.1:8000")
+    job = client.analyze("annual_report.pdf")
+    print(job['result']['financials'])
+
+Works against a server started in the same process with
+finsum.server.start_server(), so scripts can exercise the API offline.
+"""
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+
+from .sources import as_source, source_name
+
+FINISHED = ('done', 'failed')
+
+
+class ServiceError(Exception):
+    """A non-2xx response; status is the HTTP code, retry_after the seconds asked for with a 429"""
+
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+class ServiceClient:
+    """Upload PDFs to the analysis service and fetch the jobs, reports, health and metrics"""
+
+    def __init__(self, base_url, timeout=60):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, data=None, headers=None, timeout=None):
+        """(status, response bytes) of a request; raises ServiceError for 4xx / 5xx"""
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers or {}, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            body = e.read()
+            try:
+                message = json.loads(body)['error']
+            except (ValueError, KeyError, TypeError):
+                message = body.decode("utf-8", "replace") or e.reason
+            retry_after = e.headers.get("Retry-After")
+            raise ServiceError(e.code, message, int(retry_after) if retry_after else None) from None
+
+    def get_json(self, path, timeout=None):
+        return json.loads(self.request("GET", path, timeout=timeout)[1])
+
+    def submit(self, source, filename=None, wait=None):
+        """Upload a PDF (path, bytes or file object) and return the job; wait blocks up to that many seconds"""
+        filename = filename or source_name(source)
+        data = as_source(source)
+        if isinstance(data, str):
+            with open(data, "rb") as f:
+                data = f.read()
+        path = f"/analyses?filename={quote(os.path.basename(filename))}"
+        if wait:
+            path += f"&wait={wait:g}"
+        status, body = self.request("POST", path, data, {"Content-Type": "application/pdf"},
+                                    timeout=self.timeout + (wait or 0))
+        return json.loads(body)
+
+    def job(self, job_id, wait=None):
+        """A job by ID; with wait, the server holds the request until it finishes or wait seconds pass"""
+        path = f"/analyses/{job_id}" + (f"?wait={wait:g}" if wait else "")
+        return self.get_json(path, timeout=self.timeout + (wait or 0))
+
+    def jobs(self):
+        return self.get_json("/analyses")['jobs']
+
+    def report(self, job_id):
+        return self.request("GET", f"/analyses/{job_id}/report")[1].decode("utf-8")
+
+    def analyze(self, source, filename=None, timeout=600, poll=30):
+        """Upload a PDF and return the finished job, retrying while the service answers 429
+
+        Raises TimeoutError when the job has not finished within timeout seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                job = self.submit(source, filename, wait=min(poll, timeout))
+                break
+            except ServiceError as e:
+                if e.status != 429 or time.monotonic() + (e.retry_after or 1) > deadline:
+                    raise
+                time.sleep(e.retry_after or 1)
+        while job['status'] not in FINISHED:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"analysis {job['id']} did not finish within {timeout}s")
+            job = self.job(job['id'], wait=min(poll, remaining))
+        return job
+
+    def health(self):
+        return self.get_json("/health")
+
+    def metrics(self):
+        """Prometheus text of the service"""
+        return self.request("GET", "/metrics")[1].decode("utf-8")
+
+    def schema(self):
+        return self.get_json("/schema")
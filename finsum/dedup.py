@@ -0,0 +1,152 @@
+"""Near-duplicate suppression and top-k ranking for extracted snippets.
+
+Several rules of a category often match the same sentence ('acquired',
+'acquisition', 'takeover'), and the same sentence can be repeated across
+the standalone and consolidated notes. Each category keeps at most top_k
+distinct snippets: a new match that overlaps the text span of a kept
+snippet, or shares most of its word shingles and all of its figures, is
+counted as another hit on that snippet instead of being added.
+"""
+import os
+
+from .patterns import PATTERNS
+
+DEFAULT_TOP_K = 10
+
+# Share of the shorter snippet's shingles the other must contain to be a duplicate
+SHINGLE_OVERLAP = 0.8
+SHINGLE_WORDS = 3
+
+WORD = PATTERNS.compile(r"\w+", group='dedup')
+FIGURE = PATTERNS.compile(r"\d[\d,]*(?:\.\d+)?", group='dedup')
+# Words from overlapping PDF text layers come out interleaved: "rcohfaSs",
+# "eptemb2e0r2i", stray single letters
+GARBLED_WORD = PATTERNS.compile(r"[a-z][A-Z]|[A-Za-z]\d+[A-Za-z]|^[b-zB-HJ-Z]$", group='dedup')
+# Readable sentences of some length always use a few of these
+FUNCTION_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'been', 'by', 'for', 'from', 'has', 'have', 'in', 'is',
+    'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'which', 'will', 'with',
+}
+
+
+def default_top_k():
+    """Snippets kept per category from FINSUM_TOP_K"""
+    try:
+        return max(1, int(os.environ.get("FINSUM_TOP_K", DEFAULT_TOP_K)))
+    except ValueError:
+        return DEFAULT_TOP_K
+
+
+def shingles(text):
+    """The overlapping word n-grams of a snippet, as a set of hashable tuples"""
+    words = WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {tuple(words)}
+    return set(zip(*(words[i:] for i in range(SHINGLE_WORDS))))
+
+
+def is_garbled(text):
+    """Whether a snippet reads like interleaved text from overlapping PDF layers"""
+    words = [word.strip('.,;:()“”"\'') for word in text.split()]
+    if not words:
+        return False
+    odd = sum(1 for word in words if GARBLED_WORD.search(word))
+    common = sum(1 for word in words if word.lower() in FUNCTION_WORDS)
+    return odd > 0.15 * len(words) or (len(words) >= 10 and common < 0.11 * len(words))
+
+
+class Snippet:
+    """A kept snippet, its page and how often it was matched"""
+
+    def __init__(self, text, start, end, page):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.page = page
+        self.hits = 1
+        self.shingles = shingles(text)
+        self.figures = set(FIGURE.findall(text))
+        self.bonus = None
+
+    def score(self):
+        """Hits, plus one for a snippet with figures, minus two for garbled text"""
+        if self.bonus is None:
+            self.bonus = (1 if self.figures else 0) - (2 if is_garbled(self.text) else 0)
+        return self.hits + self.bonus
+
+    def rank(self):
+        """Higher is more relevant; earlier in the document wins ties"""
+        return self.score(), -self.start
+
+    def overlaps(self, start, end):
+        return self.start < end and start < self.end
+
+    def similar(self, other):
+        """Most shingles of the shorter snippet in the other, and none of its figures missing"""
+        shorter, longer = (self, other) if len(self.shingles) <= len(other.shingles) else (other, self)
+        if not shorter.figures <= longer.figures:
+            return False
+        return len(shorter.shingles & longer.shingles) >= SHINGLE_OVERLAP * len(shorter.shingles)
+
+
+class TopSnippets:
+    """The top_k most relevant distinct snippets of one category, in bounded memory"""
+
+    def __init__(self, top_k=None):
+        self.top_k = top_k or default_top_k()
+        self.kept = []
+        self.by_text = {}
+        # Kept snippet with the lowest rank, None when it has to be looked up again
+        self.weakest = None
+        self.duplicates = 0
+        self.dropped = 0
+
+    def add(self, text, start, end, page=None):
+        """Offer a match covering text[start:end]; near-duplicates add a hit to the kept snippet"""
+        # Cheap checks first: the same text, or a match over the same span
+        kept = self.by_text.get(text)
+        if kept is None:
+            kept = next((snippet for snippet in self.kept if snippet.overlaps(start, end)), None)
+        snippet = None
+        if kept is None:
+            snippet = Snippet(text, start, end, page)
+            kept = next((other for other in self.kept if other.similar(snippet)), None)
+
+        if kept is not None:
+            kept.hits += 1
+            self.duplicates += 1
+            if kept is self.weakest:
+                self.weakest = None
+            # Keep the longer wording of the two
+            if len(text) > len(kept.text):
+                snippet = snippet or Snippet(text, start, end, page)
+                snippet.hits = kept.hits
+                snippet.start, snippet.end = min(kept.start, start), max(kept.end, end)
+                self.replace(kept, snippet)
+            return
+
+        if len(self.kept) < self.top_k:
+            self.kept.append(snippet)
+            self.by_text[text] = snippet
+            return
+        self.dropped += 1
+        if self.weakest is None:
+            self.weakest = min(self.kept, key=Snippet.rank)
+        # A new snippet scores at most 2 (one hit and figures), so stronger lists skip the ranking
+        if self.weakest.score() <= 2 and snippet.rank() > self.weakest.rank():
+            self.replace(self.weakest, snippet)
+
+    def replace(self, old, new):
+        self.kept[self.kept.index(old)] = new
+        del self.by_text[old.text]
+        self.by_text[new.text] = new
+        self.weakest = None
+
+    def ranked(self):
+        return sorted(self.kept, key=Snippet.rank, reverse=True)
+
+    def texts(self):
+        return [snippet.text for snippet in self.ranked()]
+
+    def pages(self):
+        return [snippet.page for snippet in self.ranked()]
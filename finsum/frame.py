@@ -0,0 +1,120 @@
+"""Cross-filing metrics table: one pandas DataFrame for many analyzed documents.
+
+Rows are (company, period, metric) with the current, previous-quarter and
+previous-year values. QoQ / YoY changes, growth ranks among the filings of
+the same period and outlier flags are computed column-wise over all rows
+at once, so thousands of filings cost a handful of array operations.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from .analyzer import KEY_METRICS
+
+COLUMNS = ['company', 'period', 'document', 'metric', 'source', 'current', 'previous_q', 'previous_year']
+VALUES = ['current', 'previous_q', 'previous_year']
+CHANGES = [('qoq_change', 'previous_q'), ('yoy_change', 'previous_year')]
+PEER_GROUP = ['period', 'metric']
+
+# Changes further than this many robust standard deviations from the peer median are outliers
+OUTLIER_Z = 3.5
+# Scales a median absolute deviation to a standard deviation for normal data
+MAD_SCALE = 1.4826
+# Peer groups smaller than this get no growth ranks or outlier flags
+MIN_PEERS = 4
+
+
+def as_record(result):
+    """An AnalysisResult, its to_dict() or a batch.py record as a dict"""
+    return result if isinstance(result, dict) else result.to_dict()
+
+
+def default_company(record):
+    """A record's 'company', else its file name without the extension"""
+    name = record.get('company') or record.get('filename') or os.path.basename(record.get('path') or "")
+    return os.path.splitext(name)[0]
+
+
+def default_period(record):
+    return record.get('period')
+
+
+def metric_rows(results, company=default_company, period=default_period):
+    """Row tuples of every quarterly metric, plus headline figures no quarterly row covers"""
+    rows = []
+    for result in results:
+        record = as_record(result)
+        label = company(record)
+        when = period(record)
+        document = record.get('filename') or record.get('path')
+        quarterly = record.get('quarterly_data') or {}
+        for metric, values in quarterly.items():
+            rows.append((label, when, document, metric, 'quarterly',
+                         values['current'], values['previous_q'], values['previous_year']))
+        for metric, value in (record.get('financials') or {}).items():
+            # Headline PAT / PBT are the quarterly profit rows under another name
+            metric = KEY_METRICS.get(metric) or metric
+            if metric not in quarterly:
+                rows.append((label, when, document, metric, 'headline', value, np.nan, np.nan))
+    return rows
+
+
+def rows_frame(rows):
+    """DataFrame of metric_rows() with numeric values"""
+    frame = pd.DataFrame.from_records(rows, columns=COLUMNS)
+    # Headline figures are display strings such as "₹10,150 cr" or "₹36.74"
+    headline = frame['source'] == 'headline'
+    frame.loc[headline, 'current'] = pd.to_numeric(
+        frame.loc[headline, 'current'].astype(str).str.replace(r"[₹,\s]|cr$", "", regex=True), errors='coerce'
+    )
+    frame[VALUES] = frame[VALUES].astype(float)
+    return frame
+
+
+def add_changes(frame):
+    """qoq_change / yoy_change in percent; 0 where the earlier value is 0, like calculate_percentage_change"""
+    current = frame['current'].to_numpy(dtype=float)
+    for column, base in CHANGES:
+        previous = frame[base].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (current - previous) / previous * 100
+        frame[column] = np.where(previous == 0, 0.0, change)
+    return frame
+
+
+def add_growth_ranks(frame):
+    """qoq_rank / yoy_rank: 1 for the fastest growth among filings of the same period and metric"""
+    groups = frame.groupby(PEER_GROUP, dropna=False, sort=False)
+    peers = groups['metric'].transform('size')
+    for column, _ in CHANGES:
+        ranks = groups[column].rank(ascending=False, method='min')
+        frame[column.replace('_change', '_rank')] = ranks.where(peers >= MIN_PEERS)
+    return frame
+
+
+def add_outliers(frame):
+    """qoq_outlier / yoy_outlier: changes far from the peer median, by median absolute deviation"""
+    keys = [frame[column] for column in PEER_GROUP]
+    peers = frame.groupby(keys, dropna=False, sort=False)['metric'].transform('size')
+    for column, _ in CHANGES:
+        values = frame[column]
+        deviation = values - values.groupby(keys, dropna=False, sort=False).transform('median')
+        mad = deviation.abs().groupby(keys, dropna=False, sort=False).transform('median')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (deviation / (MAD_SCALE * mad)).abs().to_numpy()
+        flagged = (peers.to_numpy() >= MIN_PEERS) & (mad.to_numpy() > 0) & (z > OUTLIER_Z)
+        frame[column.replace('_change', '_outlier')] = flagged
+    return frame
+
+
+def metrics_frame(results, company=default_company, period=default_period):
+    """DataFrame of company, period and metric values across many analyzed documents
+
+    results are AnalysisResults, their to_dict() or batch.py records.
+    company and period map a record dict to its labels; by default the
+    record's 'company' (else the file name) and 'period' keys. Adds the
+    QoQ / YoY changes, growth ranks and outlier flags.
+    """
+    frame = rows_frame(metric_rows(results, company, period))
+    return add_outliers(add_growth_ranks(add_changes(frame)))
@@ -0,0 +1,217 @@
+"""Background analysis jobs on a bounded pool of worker threads.
+
+Each submitted PDF becomes a Job with an ID. Workers run the incremental
+analysis and publish the page reached and the partial results, so a
+frontend can poll instead of blocking on the analysis. The same document
+submitted again gets the job that already exists, and finished jobs stay
+retrievable by ID until they are among the oldest beyond max_finished.
+With a time or memory limit (FINSUM_TIME_LIMIT / FINSUM_MEMORY_LIMIT_MB),
+each analysis runs in a supervised subprocess (see watchdog.py), with
+the options of the factory's analyzer, and a document that crosses a
+limit finishes with a partial result.
+"""
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from .sources import as_source, default_spool_bytes, spooled
+from .watchdog import analyze_supervised, default_memory_limit_mb, default_time_limit
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def default_job_workers():
+    """Concurrent analyses from FINSUM_JOB_WORKERS"""
+    try:
+        return max(1, int(os.environ.get("FINSUM_JOB_WORKERS", "2")))
+    except ValueError:
+        return 2
+
+
+def default_max_queued():
+    """Jobs allowed to wait for a worker, from FINSUM_MAX_QUEUED"""
+    try:
+        return max(1, int(os.environ.get("FINSUM_MAX_QUEUED", "16")))
+    except ValueError:
+        return 16
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when max_queued jobs are already waiting"""
+
+
+class Job:
+    """One document's analysis and its progress"""
+
+    def __init__(self, data, filename, digest):
+        self.id = uuid.uuid4().hex
+        self.data = data
+        self.filename = filename
+        self.digest = digest
+        self.status = QUEUED
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.page = 0
+        self.page_count = 0
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.cache_hit = None
+        self.cache_stats = None
+
+    @property
+    def progress(self):
+        """Fraction of pages analyzed, 1.0 once finished"""
+        if self.status in (DONE, FAILED):
+            return 1.0
+        return self.page / self.page_count if self.page_count else 0.0
+
+    def snapshot(self, update):
+        """Keep a copy of a partial update that the worker can keep filling in"""
+        self.partial = {
+            'financials': dict(update['financials']),
+            'quarterly_data': dict(update['quarterly_data']),
+            'announcements': {category: list(items) for category, items in update['announcements'].items()},
+            'operations': {category: list(items) for category, items in update['operations'].items()},
+        }
+        self.page = update['page']
+        self.page_count = update['page_count']
+
+
+class JobQueue:
+    """Bounded pool of analysis workers with a queue-depth limit"""
+
+    def __init__(self, analyzer_factory, workers=None, max_queued=None, max_finished=32,
+                 time_limit=None, memory_limit_mb=None, on_finish=None):
+        self.analyzer_factory = analyzer_factory
+        # Called with each job once it is done or failed, on the worker thread
+        self.on_finish = on_finish
+        # Limits per analysis; with either one, jobs run in a supervised subprocess
+        self.time_limit = time_limit or default_time_limit()
+        self.memory_limit_mb = memory_limit_mb or default_memory_limit_mb()
+        self.workers = workers or default_job_workers()
+        self.max_queued = max_queued or default_max_queued()
+        self.max_finished = max_finished
+        self.pending = deque()
+        self.jobs = OrderedDict()
+        self.condition = threading.Condition()
+        # Separate from condition, so waiting callers never take a wakeup meant for a worker
+        self.job_finished = threading.Condition()
+        self.threads = []
+
+    def submit(self, source, filename):
+        """Queue a PDF (path, bytes or file object) and return its Job, or the existing job for the same bytes"""
+        data = as_source(source)
+        if isinstance(data, str):
+            with open(data, "rb") as f:
+                data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        with self.condition:
+            for job in self.jobs.values():
+                if job.digest == digest and job.status != FAILED:
+                    self.jobs.move_to_end(job.id)
+                    return job
+            if len(self.pending) >= self.max_queued:
+                raise QueueFull(f"{len(self.pending)} analyses are already waiting")
+            job = Job(data, filename, digest)
+            self.jobs[job.id] = job
+            self.pending.append(job)
+            self.start_workers()
+            self.condition.notify()
+            self.prune()
+        return job
+
+    def get(self, job_id):
+        with self.condition:
+            return self.jobs.get(job_id)
+
+    def wait(self, job, timeout=None):
+        """Block until a job is done or failed, at most timeout seconds; True when it finished"""
+        with self.job_finished:
+            return self.job_finished.wait_for(lambda: job.status in (DONE, FAILED), timeout)
+
+    def position(self, job):
+        """1-based place in the queue, 0 once a worker has it"""
+        with self.condition:
+            try:
+                return self.pending.index(job) + 1
+            except ValueError:
+                return 0
+
+    def stats(self):
+        with self.condition:
+            statuses = [job.status for job in self.jobs.values()]
+        return {status: statuses.count(status) for status in (QUEUED, RUNNING, DONE, FAILED)}
+
+    def start_workers(self):
+        while len(self.threads) < self.workers:
+            thread = threading.Thread(target=self.work, name=f"finsum-job-{len(self.threads) + 1}", daemon=True)
+            self.threads.append(thread)
+            thread.start()
+
+    def prune(self):
+        """Forget the oldest finished jobs beyond max_finished"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in (DONE, FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+
+    def work(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                job = self.pending.popleft()
+                job.status = RUNNING
+                job.started = time.time()
+            self.run(job)
+
+    def run(self, job):
+        if self.time_limit or self.memory_limit_mb:
+            self.run_supervised(job)
+            return
+        analyzer = self.analyzer_factory()
+        try:
+            with spooled(job.data, default_spool_bytes()) as source:
+                for update in analyzer.analyze_incremental(source, job.filename):
+                    if update['done']:
+                        job.result = update['result']
+                        break
+                    job.snapshot(update)
+            job.cache_hit = analyzer.cache_hit
+            if analyzer.cache is not None:
+                job.cache_stats = analyzer.cache.stats()
+            status = DONE
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            status = FAILED
+        self.finish(job, status)
+
+    def run_supervised(self, job):
+        """Run a job in a subprocess within the limits, with an analyzer configured like analyzer_factory's"""
+        try:
+            options = self.analyzer_factory().options()
+            job.result = analyze_supervised(job.data, job.filename, self.time_limit, self.memory_limit_mb,
+                                            analyzer_options=options, preview=True, on_update=job.snapshot)
+            status = DONE
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            status = FAILED
+        self.finish(job, status)
+
+    def finish(self, job, status):
+        with self.condition:
+            job.data = None
+            job.status = status
+            job.finished = time.time()
+            self.prune()
+        with self.job_finished:
+            self.job_finished.notify_all()
+        if self.on_finish is not None:
+            self.on_finish(job)
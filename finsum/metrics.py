@@ -0,0 +1,254 @@
+"""Per-stage timing and counters for one analysis.
+
+Stages are recorded with wall-clock time, CPU time, call count and named
+item counts. Stages can nest; sub-stages use dotted names such as
+'announcements.dividends'. Worker processes keep their own AnalysisMetrics
+and the parent merges them with merge(), which also adds their CPU time.
+
+The peak resident memory is the kernel's high-water mark (ru_maxrss), read
+at the end of every stage, so spikes inside a stage are counted. It is
+process-wide: it covers every thread, so analyses running side by side in
+one process (JobQueue, the HTTP server) share it, as does anything the
+process did before. Workers merged in report theirs separately.
+"""
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def process_rss_mb(pid="self"):
+    """Resident memory of a process in MB from /proc, None where that is not available"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def process_peak_rss_mb():
+    """Highest resident memory this process has reached so far in MB, None where getrusage is not available"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def child_pids(pid):
+    """Direct children of a process from /proc, empty where that is not available"""
+    children = []
+    try:
+        # /proc/<pid>/task/<tid>/children needs CONFIG_PROC_CHILDREN; otherwise scan every process's parent
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+        return children
+    except OSError:
+        pass
+    try:
+        entries = [entry for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return []
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # pid (comm) state ppid ...; comm may itself hold spaces and parentheses
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if parent == pid:
+            children.append(int(entry))
+    return children
+
+
+def descendant_pids(pid):
+    """Children, grandchildren and so on of a process, e.g. the page-extraction pool of an analysis"""
+    found = []
+    pending = child_pids(pid)
+    while pending:
+        child = pending.pop()
+        found.append(child)
+        pending.extend(child_pids(child))
+    return found
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of a process and all its descendants in MB, None where /proc is not available"""
+    total = process_rss_mb(pid)
+    if total is None:
+        return None
+    for child in descendant_pids(pid):
+        total += process_rss_mb(child) or 0.0
+    return total
+
+
+def timed(name):
+    """Method decorator recording each call as a stage of self.metrics"""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.stage(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class AnalysisMetrics:
+    """Timings and counters of the stages of one analysis"""
+
+    def __init__(self):
+        self.stages = {}
+        self.started = None
+        self.cpu_started = None
+        self.worker_cpu = 0.0
+        self.finished = None
+        # Process-wide resident high-water MB as of the last stage end, None where it cannot be read
+        self.process_peak_rss_mb = None
+        self.worker_peak_rss_mb = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild metrics from to_dict() output, e.g. to render them as Prometheus text"""
+        metrics = cls()
+        metrics.add_stages(data['stages'])
+        metrics.finished = (data['elapsed_seconds'], data['cpu_seconds'])
+        # peak_rss_mb is the key of results stored before the peak was labelled process-wide
+        metrics.process_peak_rss_mb = data.get('process_peak_rss_mb', data.get('peak_rss_mb'))
+        metrics.worker_peak_rss_mb = data.get('worker_peak_rss_mb')
+        return metrics
+
+    def record(self, name):
+        if name not in self.stages:
+            self.stages[name] = {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0, 'items': {}}
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block of work and add it to the named stage"""
+        if self.started is None:
+            self.started = time.perf_counter()
+            self.cpu_started = time.process_time()
+        self.finished = None
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield self.record(name)
+        finally:
+            record = self.record(name)
+            record['wall_seconds'] += time.perf_counter() - wall
+            record['cpu_seconds'] += time.process_time() - cpu
+            record['calls'] += 1
+            self.sample_memory()
+
+    def sample_memory(self):
+        """Update the peak with the process's resident high-water mark"""
+        peak_mb = process_peak_rss_mb()
+        if peak_mb is not None:
+            self.process_peak_rss_mb = peak_mb
+        return peak_mb
+
+    def count(self, name, item, amount=1):
+        """Add to an item counter of a stage, e.g. count('page_text', 'pages')"""
+        items = self.record(name)['items']
+        items[item] = items.get(item, 0) + amount
+
+    def add_stages(self, stages):
+        for name, source in stages.items():
+            record = self.record(name)
+            record['wall_seconds'] += source['wall_seconds']
+            record['cpu_seconds'] += source['cpu_seconds']
+            record['calls'] += source['calls']
+            for item, amount in source['items'].items():
+                record['items'][item] = record['items'].get(item, 0) + amount
+
+    def merge(self, other):
+        """Add the stages and CPU time of a worker's AnalysisMetrics or its to_dict() output"""
+        if isinstance(other, AnalysisMetrics):
+            other = other.to_dict()
+        self.add_stages(other['stages'])
+        self.worker_cpu += other['cpu_seconds']
+        worker_peak = max(filter(None, [other.get('process_peak_rss_mb'), other.get('worker_peak_rss_mb')]),
+                          default=None)
+        if worker_peak is not None:
+            self.worker_peak_rss_mb = max(self.worker_peak_rss_mb or 0.0, worker_peak)
+
+    def finish(self):
+        """Freeze the totals at the end of the analysis"""
+        if self.finished is None:
+            self.sample_memory()
+        self.finished = (self.elapsed(), self.total_cpu())
+
+    def elapsed(self):
+        """Wall-clock seconds since the first stage started"""
+        if self.finished is not None:
+            return self.finished[0]
+        return time.perf_counter() - self.started if self.started is not None else 0.0
+
+    def total_cpu(self):
+        """CPU seconds of this process since the first stage, plus merged worker CPU"""
+        if self.finished is not None:
+            return self.finished[1]
+        own = time.process_time() - self.cpu_started if self.cpu_started is not None else 0.0
+        return own + self.worker_cpu
+
+    def to_dict(self):
+        return {
+            'elapsed_seconds': round(self.elapsed(), 4),
+            'cpu_seconds': round(self.total_cpu(), 4),
+            'process_peak_rss_mb': (round(self.process_peak_rss_mb, 1)
+                                    if self.process_peak_rss_mb is not None else None),
+            'worker_peak_rss_mb': round(self.worker_peak_rss_mb, 1) if self.worker_peak_rss_mb is not None else None,
+            'stages': {
+                name: {
+                    'wall_seconds': round(record['wall_seconds'], 4),
+                    'cpu_seconds': round(record['cpu_seconds'], 4),
+                    'calls': record['calls'],
+                    'items': dict(record['items']),
+                }
+                for name, record in self.stages.items()
+            },
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix="finsum", labels=None):
+        """Prometheus text exposition of the stage counters and the peak memory gauge"""
+        extra = "".join(f',{key}="{escape_label(value)}"' for key, value in (labels or {}).items())
+        lines = []
+
+        def metric(name, help_text, samples, kind="counter"):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.extend(f"{prefix}_{name}{{{sample_labels}{extra}}} {value}" for sample_labels, value in samples)
+
+        stages = self.stages.items()
+        metric("stage_wall_seconds", "Wall-clock time spent per analysis stage",
+               [(f'stage="{escape_label(name)}"', f"{r['wall_seconds']:.6f}") for name, r in stages])
+        metric("stage_cpu_seconds", "CPU time spent per analysis stage",
+               [(f'stage="{escape_label(name)}"', f"{r['cpu_seconds']:.6f}") for name, r in stages])
+        metric("stage_calls_total", "Times each analysis stage ran",
+               [(f'stage="{escape_label(name)}"', r['calls']) for name, r in stages])
+        metric("stage_items_total", "Items produced per analysis stage",
+               [(f'stage="{escape_label(name)}",item="{escape_label(item)}"', amount)
+                for name, r in stages for item, amount in r['items'].items()])
+        peaks = [(f'process="{process}"', f"{peak:.1f}")
+                 for process, peak in (('main', self.process_peak_rss_mb), ('worker', self.worker_peak_rss_mb))
+                 if peak is not None]
+        if peaks:
+            metric("peak_rss_megabytes", "Peak resident memory of the process that ran the analysis (process-wide)",
+                   peaks, kind="gauge")
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
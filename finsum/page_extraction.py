@@ -0,0 +1,385 @@
+"""Page-level PDF extraction shared by the analyzer and its worker processes.
+
+Kept free of Streamlit so process-pool workers can import it cheaply;
+pdfplumber is only imported when a PDF is opened.
+
+Page text comes from a backend: 'pdfplumber' (layout analysis, the
+default), or 'pdfium', which reads the text with pypdfium2 (installed
+with pdfplumber) many times faster. With pdfium, pages that look like
+financial statements are still read with pdfplumber, so the statement
+text the financial patterns run on and the table extraction are the same
+as before. 'auto' picks pdfium when pypdfium2 can be imported.
+
+pdfplumber keeps the parsed layout of every page it has read until the
+document is closed, so pages are released as soon as their text and
+tables are taken. max_resident_pages also bounds the objects pdfminer
+caches for the whole document (content streams, fonts) by reopening the
+PDF after that many pages.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+from .metrics import AnalysisMetrics
+from .patterns import PATTERNS
+from .sources import pdf_stream
+
+# Table finding is slow, so it only runs on pages whose text names a
+# financial statement or has several rows of amounts
+STATEMENT_HEADERS = PATTERNS.compile(
+    r"revenue\s+from\s+operations|statement\s+of\s+profit\s+and\s+loss|profit\s+and\s+loss\s+account"
+    r"|balance\s+sheet|statement\s+of\s+cash\s+flows?|cash\s+flow\s+statement|financial\s+results"
+    r"|profit\s+before\s+tax|total\s+income|particulars",
+    re.IGNORECASE,
+    group='table_pages',
+)
+AMOUNT = PATTERNS.compile(r"\(?-?\d[\d,]*\.\d{1,2}\)?", group='amount_rows')
+MIN_AMOUNT_ROWS = 8
+
+# Statements are ruled, so only drawn lines are used to find cells
+TABLE_SETTINGS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "snap_tolerance": 3,
+    "join_tolerance": 3,
+    "intersection_tolerance": 5,
+}
+
+# Left out of content fingerprints: how a stream is encoded, and links up the page tree
+STREAM_ENCODING_KEYS = {'Length', 'Filter', 'DecodeParms', 'DL'}
+PAGE_TREE_KEYS = {'Parent', 'P'}
+
+# Page ranges handed out per worker, so one slow range does not hold up the pool
+RANGES_PER_WORKER = 4
+
+TEXT_BACKENDS = ('pdfplumber', 'pdfium', 'auto')
+# pdfium is not thread-safe; analyses running on threads take turns
+PDFIUM_LOCK = threading.Lock()
+
+
+def default_workers():
+    """Worker count from FINSUM_WORKERS, serial extraction when unset"""
+    try:
+        return max(1, int(os.environ.get("FINSUM_WORKERS", "1")))
+    except ValueError:
+        return 1
+
+
+def process_context():
+    """Start children from a clean forkserver (no threads of the caller) where there is one
+
+    Analyses run on job queue threads inside the UI and HTTP server, so
+    forking that process directly could copy a lock held by another thread.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["finsum.analyzer"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def default_max_resident_pages():
+    """Pages read per opening of a PDF from FINSUM_MAX_RESIDENT_PAGES, None for no limit"""
+    try:
+        pages = int(os.environ.get("FINSUM_MAX_RESIDENT_PAGES", "0"))
+    except ValueError:
+        return None
+    return pages if pages > 0 else None
+
+
+def default_text_backend():
+    """Text backend from FINSUM_TEXT_BACKEND: pdfplumber (default), pdfium or auto"""
+    backend = os.environ.get("FINSUM_TEXT_BACKEND", "pdfplumber").lower()
+    return backend if backend in TEXT_BACKENDS else "pdfplumber"
+
+
+def resolve_text_backend(backend):
+    """'pdfplumber' or 'pdfium' for a backend name; auto is pdfium when pypdfium2 imports"""
+    if backend not in TEXT_BACKENDS:
+        raise ValueError(f"Unknown text backend {backend!r}, expected one of {', '.join(TEXT_BACKENDS)}")
+    if backend != 'auto':
+        return backend
+    try:
+        import pypdfium2  # noqa: F401
+    except ImportError:
+        return 'pdfplumber'
+    return 'pdfium'
+
+
+class PdfiumText:
+    """Raw page text of a document read with pypdfium2"""
+
+    def __init__(self, source):
+        import pypdfium2
+
+        with PDFIUM_LOCK:
+            self.document = pypdfium2.PdfDocument(source)
+
+    def __call__(self, page):
+        """Text of a pdfplumber page's counterpart, with pdfplumber's line endings"""
+        with PDFIUM_LOCK:
+            pdfium_page = self.document[page.page_number - 1]
+            try:
+                text_page = pdfium_page.get_textpage()
+                try:
+                    text = text_page.get_text_range()
+                finally:
+                    text_page.close()
+            finally:
+                pdfium_page.close()
+        return "\n".join(line.rstrip() for line in text.splitlines())
+
+    def close(self):
+        with PDFIUM_LOCK:
+            self.document.close()
+
+
+@contextmanager
+def fast_text(source, backend, metrics):
+    """Yield the page text reader of a backend, None for pdfplumber"""
+    if backend != 'pdfium':
+        yield None
+        return
+    with metrics.stage('pdf_open'):
+        reader = PdfiumText(source)
+    try:
+        yield reader
+    finally:
+        reader.close()
+
+
+def is_table_page(text):
+    """Whether a page's text looks like a financial statement worth searching for tables"""
+    if not text:
+        return False
+    if STATEMENT_HEADERS.search(text):
+        return True
+    rows = 0
+    for line in text.split("\n"):
+        if len(AMOUNT.findall(line)) >= 3:
+            rows += 1
+            if rows >= MIN_AMOUNT_ROWS:
+                return True
+    return False
+
+
+def page_table_key(text):
+    """Per-page table cache key: the page text under the current table settings"""
+    digest = hashlib.sha256(json.dumps(TABLE_SETTINGS, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0" + text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def find_tables(page, text, metrics, table_cache=None):
+    """Tables with more than two rows on a page, reusing cached results for identical pages"""
+    key = page_table_key(text) if table_cache is not None else None
+    if key is not None:
+        cached = table_cache.get_page_tables(key)
+        if cached is not None:
+            metrics.count('table_extraction', 'cached_pages')
+            return cached
+
+    with metrics.stage('table_extraction'):
+        tables = [table for table in page.extract_tables(TABLE_SETTINGS) if table and len(table) > 2]
+    metrics.count('table_extraction', 'pages')
+    metrics.count('table_extraction', 'tables', len(tables))
+
+    if key is not None:
+        table_cache.put_page_tables(key, tables)
+    return tables
+
+
+def pdf_fingerprint(obj, memo):
+    """Text form of a PDF object with references resolved and streams hashed
+
+    Object numbers are left out, so the same content written by another PDF
+    producer or saved as a revision fingerprints the same. memo maps object
+    ids to fingerprints and is shared by the pages of one document.
+    """
+    from pdfminer.pdftypes import PDFObjRef, PDFStream
+    from pdfminer.psparser import PSLiteral
+
+    if isinstance(obj, PDFObjRef):
+        if obj.objid not in memo:
+            memo[obj.objid] = "<cycle>"
+            memo[obj.objid] = pdf_fingerprint(obj.resolve(), memo)
+        return memo[obj.objid]
+    if isinstance(obj, PDFStream):
+        attrs = {name: value for name, value in obj.attrs.items() if name not in STREAM_ENCODING_KEYS}
+        data = hashlib.sha256(obj.get_data()).hexdigest()
+        return f"stream({pdf_fingerprint(attrs, memo)},{data})"
+    if isinstance(obj, dict):
+        items = sorted((str(name), value) for name, value in obj.items() if name not in PAGE_TREE_KEYS)
+        return "{" + ",".join(f"{name}:{pdf_fingerprint(value, memo)}" for name, value in items) + "}"
+    if isinstance(obj, (list, tuple)):
+        return "[" + ",".join(pdf_fingerprint(value, memo) for value in obj) + "]"
+    if isinstance(obj, PSLiteral):
+        return f"/{obj.name}"
+    if isinstance(obj, (int, float)) and not isinstance(obj, bool):
+        # 0 and 0.0 are the same coordinate
+        return repr(float(obj))
+    return repr(obj)
+
+
+def page_content_key(page, memo):
+    """Hash of what a page draws: its content streams, resources and boxes, or None
+
+    Computed without parsing the page layout, so unchanged pages of a revised
+    document can be recognised before their text is extracted.
+    """
+    page_obj = page.page_obj
+    try:
+        fingerprint = pdf_fingerprint(
+            [page_obj.contents, page_obj.resources, page_obj.mediabox, page_obj.cropbox, page_obj.rotate], memo
+        )
+    except Exception:
+        return None
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def page_text(page, metrics, table_cache=None, memo=None, reader=None):
+    """Text of a page, reused from the cache when a page with the same content was parsed before
+
+    reader is a fast text backend (see fast_text); pages whose fast text
+    looks like a financial statement are read again with pdfplumber.
+    """
+    key = page_content_key(page, memo if memo is not None else {}) if table_cache is not None else None
+    if key is not None and reader is not None:
+        # Backends lay text out differently, so each keeps its own entries
+        key = hashlib.sha256(f"{key}:pdfium".encode("utf-8")).hexdigest()
+    if key is not None:
+        text = table_cache.get_page_text(key)
+        if text is not None:
+            metrics.count('page_text', 'cached_pages')
+            return text
+
+    text = None
+    if reader is not None:
+        with metrics.stage('page_text_pdfium'):
+            text = reader(page)
+        metrics.count('page_text_pdfium', 'pages')
+        if is_table_page(text):
+            metrics.count('page_text_pdfium', 'statement_pages')
+            text = None
+    if text is None:
+        with metrics.stage('page_text'):
+            text = page.extract_text()
+        metrics.count('page_text', 'pages')
+    metrics.count('page_text', 'characters', len(text or ""))
+
+    if key is not None:
+        table_cache.put_page_text(key, text)
+    return text
+
+
+def extract_page(page, metrics, table_cache=None, with_tables=True, memo=None, reader=None):
+    """Text and candidate tables of one pdfplumber page
+
+    table_cache (a PDFTextCache) reuses the text and tables of pages seen
+    before; memo is the pdf_fingerprint memo of the page's document and
+    reader the fast text backend, if any.
+    """
+    text = page_text(page, metrics, table_cache, memo, reader)
+    if not with_tables:
+        return text, []
+
+    with metrics.stage('table_routing'):
+        routed = is_table_page(text)
+    metrics.count('table_routing', 'routed_pages' if routed else 'skipped_pages')
+
+    tables = find_tables(page, text, metrics, table_cache) if routed else []
+    return text, tables
+
+
+def open_pdf(source, metrics, pages=None):
+    """Open a PDF path or PDF bytes and load its page list, timed as the pdf_open stage
+
+    pages limits the page list to those page numbers (1-based).
+    """
+    import pdfplumber
+
+    with metrics.stage('pdf_open'):
+        pdf = pdfplumber.open(pdf_stream(source), pages=pages)
+        pdf.pages
+    metrics.count('pdf_open', 'files')
+    return pdf
+
+
+def iter_document_pages(source, metrics, max_resident_pages=None, start=0, stop=None):
+    """Yield (index, page count, pdfplumber page) for pages [start, stop) of a PDF
+
+    Each page's parsed objects are released when the next page is asked
+    for (or the generator is closed). With max_resident_pages, the PDF is
+    reopened after that many pages so pdfminer's document-wide object cache
+    does not grow with the page count either.
+    """
+    pdf = open_pdf(source, metrics)
+    try:
+        page_count = len(pdf.pages)
+        stop = page_count if stop is None else min(stop, page_count)
+        window = max_resident_pages or max(1, stop - start)
+        for window_start in range(start, stop, window):
+            window_stop = min(stop, window_start + window)
+            if window_start > start:
+                pdf.close()
+                pdf = open_pdf(source, metrics, pages=range(window_start + 1, window_stop + 1))
+                metrics.count('pdf_open', 'reopened')
+                window_pages = pdf.pages
+            else:
+                window_pages = pdf.pages[window_start:window_stop]
+            for index, page in enumerate(window_pages, window_start):
+                try:
+                    yield index, page_count, page
+                finally:
+                    page.close()
+    finally:
+        pdf.close()
+
+
+def extract_page_range(pdf_path, start, stop, table_cache=None, backend='pdfplumber', max_resident_pages=None):
+    """Open the PDF and extract pages [start, stop); runs inside a worker process
+
+    Returns the pages and the worker's metrics as a dict.
+    """
+    metrics = AnalysisMetrics()
+    results = []
+    memo = {}
+    with fast_text(pdf_path, backend, metrics) as reader:
+        for _, _, page in iter_document_pages(pdf_path, metrics, max_resident_pages, start, stop):
+            results.append(extract_page(page, metrics, table_cache, memo=memo, reader=reader))
+    return results, metrics.to_dict()
+
+
+def page_ranges(page_count, workers):
+    """Split page indices into contiguous (start, stop) ranges"""
+    chunks = min(page_count, workers * RANGES_PER_WORKER)
+    size, extra = divmod(page_count, chunks)
+    ranges = []
+    start = 0
+    for i in range(chunks):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def iter_pages_parallel(pdf_path, page_count, workers, metrics, table_cache=None, backend='pdfplumber',
+                        max_resident_pages=None):
+    """Extract all pages on a process pool, yielded in page order as ranges finish"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = page_ranges(page_count, workers)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=process_context())
+    try:
+        futures = [pool.submit(extract_page_range, pdf_path, start, stop, table_cache, backend, max_resident_pages)
+                   for start, stop in ranges]
+        for future in futures:
+            pages, worker_metrics = future.result()
+            metrics.merge(worker_metrics)
+            yield from pages
+    finally:
+        pool.shutdown(cancel_futures=True)
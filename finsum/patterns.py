@@ -0,0 +1,161 @@
+"""Registry of every regex the engine uses, compiled once, with per-pattern cost counters.
+
+Patterns are compiled when their module is imported. Each call records the
+time it took and whether it matched, so report() can rank the patterns by
+cost and flag those that never fire. With FINSUM_REGEX_TIMEOUT set, patterns
+are compiled with the regex package instead of re, and a call running past
+the timeout is abandoned as no match (counted under timeouts), so one
+pathological page cannot stall an analysis.
+
+Counters are kept per process: with several extraction workers the
+page-level patterns are counted in the workers.
+"""
+import os
+import re
+import threading
+import time
+
+
+def default_regex_timeout():
+    """Seconds one pattern call may run from FINSUM_REGEX_TIMEOUT, None for no limit"""
+    try:
+        timeout = float(os.environ.get("FINSUM_REGEX_TIMEOUT", "0"))
+    except ValueError:
+        return None
+    return timeout if timeout > 0 else None
+
+
+class Pattern:
+    """A compiled pattern that counts its calls, matches, time and timeouts"""
+
+    def __init__(self, registry, pattern, flags, group, timeout):
+        self.registry = registry
+        self.pattern = pattern
+        self.group = group or 'other'
+        self.regex = registry.engine.compile(pattern, flags)
+        self.flags = self.regex.flags
+        # Only the regex package takes a timeout
+        self.options = {'timeout': timeout} if timeout and registry.engine is not re else {}
+        self.calls = 0
+        self.matches = 0
+        self.seconds = 0.0
+        self.timeouts = 0
+
+    def add(self, seconds, matches, timed_out=False):
+        with self.registry.lock:
+            self.calls += 1
+            self.matches += matches
+            self.seconds += seconds
+            self.timeouts += timed_out
+
+    def call(self, method, *args, matched=bool):
+        start = time.perf_counter()
+        try:
+            result = method(*args, **self.options)
+        except TimeoutError:
+            self.add(time.perf_counter() - start, 0, timed_out=True)
+            return None
+        self.add(time.perf_counter() - start, 1 if matched(result) else 0)
+        return result
+
+    def search(self, text, pos=0, endpos=None):
+        return self.call(self.regex.search, text, pos, len(text) if endpos is None else endpos)
+
+    def match(self, text, pos=0, endpos=None):
+        return self.call(self.regex.match, text, pos, len(text) if endpos is None else endpos)
+
+    def findall(self, text):
+        return self.call(self.regex.findall, text) or []
+
+    def sub(self, repl, text):
+        # subn, so a call that replaced nothing is not counted as a match
+        result = self.call(self.regex.subn, repl, text, matched=lambda result: result[1])
+        # A timed out substitution leaves the text as it was
+        return text if result is None else result[0]
+
+    def finditer(self, text, pos=0, endpos=None):
+        matches = 0
+        seconds = 0.0
+        timed_out = False
+        iterator = self.regex.finditer(text, pos, len(text) if endpos is None else endpos, **self.options)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    match = next(iterator)
+                except StopIteration:
+                    break
+                except TimeoutError:
+                    timed_out = True
+                    break
+                finally:
+                    seconds += time.perf_counter() - start
+                matches += 1
+                yield match
+        finally:
+            self.add(seconds, matches, timed_out)
+
+
+class PatternRegistry:
+    """Compiled patterns keyed by (pattern, flags), shared by every analysis in the process"""
+
+    def __init__(self, timeout=None):
+        self.engine = re
+        self.timeout = timeout
+        if timeout:
+            try:
+                import regex
+                self.engine = regex
+            except ImportError:
+                print("⚠️ FINSUM_REGEX_TIMEOUT needs the regex package; patterns run without a timeout")
+                self.timeout = None
+        self.patterns = {}
+        self.lock = threading.Lock()
+
+    def compile(self, pattern, flags=0, group=None, timeout=None):
+        """The registered Pattern for pattern and flags; group names what uses it in the report"""
+        key = (pattern, flags)
+        compiled = self.patterns.get(key)
+        if compiled is None:
+            compiled = self.patterns[key] = Pattern(self, pattern, flags, group, timeout or self.timeout)
+        elif group and group not in compiled.group.split(", "):
+            compiled.group += f", {group}"
+        return compiled
+
+    def report(self):
+        """Per-pattern counters, costliest first; never_matched flags patterns that did not fire once"""
+        with self.lock:
+            rows = [{
+                'group': compiled.group,
+                'pattern': compiled.pattern,
+                'calls': compiled.calls,
+                'matches': compiled.matches,
+                'seconds': compiled.seconds,
+                'timeouts': compiled.timeouts,
+                'never_matched': compiled.matches == 0,
+            } for compiled in self.patterns.values()]
+        return sorted(rows, key=lambda row: row['seconds'], reverse=True)
+
+    def format_report(self, limit=None):
+        """The report as a text table; patterns that never fired are marked with ∅"""
+        rows = self.report()
+        total = sum(row['seconds'] for row in rows) or 1.0
+        lines = [f"{'Seconds':>9} {'Share':>6} {'Calls':>8} {'Matches':>8} {'Timeouts':>8}  Group / pattern"]
+        for row in rows[:limit]:
+            marker = "∅ " if row['never_matched'] else "  "
+            lines.append(
+                f"{row['seconds']:>9.4f} {row['seconds'] / total:>6.1%} {row['calls']:>8} {row['matches']:>8} "
+                f"{row['timeouts']:>8}  {marker}{row['group']}: {row['pattern'][:70]}"
+            )
+        never = sum(1 for row in rows if row['never_matched'])
+        lines.append(f"{len(rows)} patterns, {never} never matched (∅)")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self.lock:
+            for compiled in self.patterns.values():
+                compiled.calls = compiled.matches = compiled.timeouts = 0
+                compiled.seconds = 0.0
+
+
+PATTERNS = PatternRegistry(default_regex_timeout())
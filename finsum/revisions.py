@@ -0,0 +1,60 @@
+"""What changed between two versions of a filing, e.g. results and their revision.
+
+Works on AnalysisResult objects or their to_dict() output, so a result saved
+as JSON (or a batch.py record) can be compared with a fresh analysis.
+"""
+import hashlib
+
+
+def page_hashes(pages):
+    """SHA-256 of every page text"""
+    return [hashlib.sha256((text or "").encode("utf-8")).hexdigest() for text in pages]
+
+
+def as_dict(result):
+    return result if isinstance(result, dict) else result.to_dict()
+
+
+def changed_pages(before, after):
+    """1-based numbers of the pages whose text differs, including pages only one version has"""
+    return [i + 1 for i in range(max(len(before), len(after)))
+            if i >= len(before) or i >= len(after) or before[i] != after[i]]
+
+
+def diff_values(before, after):
+    """{key: {'before': ..., 'after': ...}} for keys added, removed or changed"""
+    return {
+        key: {'before': before.get(key), 'after': after.get(key)}
+        for key in list(before) + [key for key in after if key not in before]
+        if before.get(key) != after.get(key)
+    }
+
+
+def diff_lists(before, after):
+    """{category: {'added': [...], 'removed': [...]}} for categories whose items changed"""
+    changes = {}
+    for category in list(before) + [category for category in after if category not in before]:
+        old_items = before.get(category, [])
+        new_items = after.get(category, [])
+        old_set, new_set = set(old_items), set(new_items)
+        added = [item for item in new_items if item not in old_set]
+        removed = [item for item in old_items if item not in new_set]
+        if added or removed:
+            changes[category] = {'added': added, 'removed': removed}
+    return changes
+
+
+def diff_results(previous, current):
+    """Changed pages, metrics and announcements from one version's result to the next"""
+    previous = as_dict(previous)
+    current = as_dict(current)
+    before_pages = previous.get('page_hashes') or []
+    after_pages = current.get('page_hashes') or []
+    return {
+        'page_count': {'before': len(before_pages), 'after': len(after_pages)},
+        'changed_pages': changed_pages(before_pages, after_pages),
+        'financials': diff_values(previous.get('financials', {}), current.get('financials', {})),
+        'quarterly_data': diff_values(previous.get('quarterly_data', {}), current.get('quarterly_data', {})),
+        'announcements': diff_lists(previous.get('announcements', {}), current.get('announcements', {})),
+        'operations': diff_lists(previous.get('operations', {}), current.get('operations', {})),
+    }
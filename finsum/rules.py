@@ -0,0 +1,182 @@
+"""Regex rules for corporate announcements, business operations and financial figures."""
+import re
+
+# CORPORATE ANNOUNCEMENT RULES
+# (category, pattern, flags, template) in the order the categories are filled.
+# Rules with a template format the captured group, the others keep the
+# cleaned text snippet. DOTALL rules are matched sentence by sentence.
+ANNOUNCEMENT_RULES = [
+    # Dividends & distributions
+    ('dividends', r'dividend.*?₹\s*(\d+\.?\d*)\s*per\s+share', re.IGNORECASE, "Dividend: ₹{} per share"),
+    ('dividends', r'interim\s+dividend.*?₹\s*(\d+\.?\d*)', re.IGNORECASE, "Dividend: ₹{} per share"),
+    ('dividends', r'final\s+dividend.*?₹\s*(\d+\.?\d*)', re.IGNORECASE, "Dividend: ₹{} per share"),
+    ('dividends', r'special\s+dividend.*?₹\s*(\d+\.?\d*)', re.IGNORECASE, "Dividend: ₹{} per share"),
+
+    # Fund raising
+    ('fund_raising', r'fund.*raising.*?₹\s*([\d,]+\.?\d*)', re.IGNORECASE, "Fund Raising: ₹{}"),
+    ('fund_raising', r'issuance.*debentures.*?₹\s*([\d,]+\.?\d*)', re.IGNORECASE, "Fund Raising: ₹{}"),
+    ('fund_raising', r'QIP.*?₹\s*([\d,]+\.?\d*)', re.IGNORECASE, "Fund Raising: ₹{}"),
+    ('fund_raising', r'preferential.*issue.*?₹\s*([\d,]+\.?\d*)', re.IGNORECASE, "Fund Raising: ₹{}"),
+    ('fund_raising', r'rights.*issue.*?₹\s*([\d,]+\.?\d*)', re.IGNORECASE, "Fund Raising: ₹{}"),
+
+    # Acquisitions & mergers
+    ('acquisitions_mergers', r'acquired.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('acquisitions_mergers', r'acquisition.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('acquisitions_mergers', r'merged.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('acquisitions_mergers', r'amalgamation.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('acquisitions_mergers', r'takeover.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+
+    # Legal cases & disputes
+    ('legal_cases', r'legal.*case.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('disputes', r'dispute.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('disputes', r'arbitration.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('disputes', r'litigation.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('legal_cases', r'court.*case.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('legal_cases', r'hon\'ble\s+(?:supreme\s+)?court.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('disputes', r'NCLT.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('legal_cases', r'tribunal.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('disputes', r'SEBI.*order.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('disputes', r'regulatory.*penalty.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+
+    # Regulatory updates
+    ('regulatory_updates', r'CERC.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('regulatory_updates', r'MERC.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('regulatory_updates', r'regulatory.*commission.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('regulatory_updates', r'approval.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('regulatory_updates', r'clearance.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('regulatory_updates', r'license.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('regulatory_updates', r'permit.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+
+    # Project announcements
+    ('project_announcements', r'project.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('project_announcements', r'expansion.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('project_announcements', r'capacity.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('project_announcements', r'new.*plant.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('project_announcements', r'facility.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('project_announcements', r'MW.*project.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+
+    # Board & management changes
+    ('appointments', r'appointed.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('resignations', r'resigned.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('board_meetings', r'CEO.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('board_meetings', r'MD.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('board_meetings', r'Director.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('board_meetings', r'Board.*meeting.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+
+    # Environmental & compliance
+    ('environmental_issues', r'environmental.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('environmental_issues', r'pollution.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('environmental_issues', r'NGT.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('environmental_issues', r'green.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('environmental_issues', r'compliance.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+
+    # Credit rating
+    ('credit_rating', r'credit.*rating.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('credit_rating', r'CRISIL.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('credit_rating', r'ICRA.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('credit_rating', r'Care.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('credit_rating', r'upgraded.*rating.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+    ('credit_rating', r'downgraded.*rating.*?([^.]{30,150})', re.IGNORECASE | re.DOTALL, None),
+]
+
+
+# BUSINESS OPERATIONS RULES
+OPERATION_RULES = [
+    # Orderbook & contracts
+    ('orderbook', r'order.*book.*?₹\s*([\d,]+\.?\d*)', re.IGNORECASE, "Orderbook: ₹{}"),
+    ('new_orders', r'new.*order.*?₹\s*([\d,]+\.?\d*)', re.IGNORECASE, "New Order: ₹{}"),
+    ('new_orders', r'contract.*?won.*?₹\s*([\d,]+\.?\d*)', re.IGNORECASE, "New Order: ₹{}"),
+    ('orderbook', r'deal.*?worth.*?₹\s*([\d,]+\.?\d*)', re.IGNORECASE, "Orderbook: ₹{}"),
+
+    # Operational metrics
+    ('operational_metrics', r'capacity.*?(\d+,?\d*)\s*MW', re.IGNORECASE, "Operations: {}"),
+    ('operational_metrics', r'generation.*?(\d+\.?\d*)\s*BU', re.IGNORECASE, "Operations: {}"),
+    ('operational_metrics', r'plant.*load.*factor.*?(\d+\.?\d*\s*%)', re.IGNORECASE, "Operations: {}"),
+    ('operational_metrics', r'production.*?(\d+,?\d*)', re.IGNORECASE, "Operations: {}"),
+    ('operational_metrics', r'sales.*volume.*?(\d+,?\d*)', re.IGNORECASE, "Operations: {}"),
+
+    # Market updates
+    ('market_updates', r'market.*share.*?([^.]{30,100})', re.IGNORECASE | re.DOTALL, "Market: {}"),
+    ('market_updates', r'competition.*?([^.]{30,100})', re.IGNORECASE | re.DOTALL, "Market: {}"),
+    ('market_updates', r'industry.*?([^.]{30,100})', re.IGNORECASE | re.DOTALL, "Market: {}"),
+    ('market_updates', r'demand.*?([^.]{30,100})', re.IGNORECASE | re.DOTALL, "Market: {}"),
+]
+
+
+# QUARTERLY RESULT PATTERNS
+# metric: patterns tried in order; each captures the current quarter, the
+# previous quarter and the same quarter last year from a results table row
+QUARTERLY_PATTERNS = {
+    'revenue': [
+        r'Revenue\s+from\s+operations\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+        r'Total\s+revenue\s+from\s+operations\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+    ],
+    'total_income': [
+        r'Total\s+Income\s+\(I\+II\)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+        r'Total\s+Income\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+    ],
+    'finance_cost': [
+        r'Finance\s+costs\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+    ],
+    'total_expenses': [
+        r'Total\s+expenses\s+\(IV\)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+        r'Total\s+expenses\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+    ],
+    'profit_before_tax': [
+        r'Profit\s+before\s+tax\s+\(III-IV\)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+        r'Profit\s+before\s+tax\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+        r'PBT\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+    ],
+    'profit_for_period': [
+        r'Profit\s+for\s+the\s+period\s+\(V-VI\)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+        r'Profit\s+for\s+the\s+period\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+        r'Net\s+Profit\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+        r'PAT\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+    ],
+    'eps': [
+        r'Basic.*?\(Amount in INR\)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+        r'Earnings per share.*?([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+    ],
+    'borrowings': [
+        r'Borrowings\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+        r'Total\s+borrowings\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)\s+([\d,]+\.?\d*)',
+    ]
+}
+
+
+# HEADLINE FINANCIAL PATTERNS
+# (pattern, metric); the first valid amount found for a metric is kept
+FINANCIAL_PATTERNS = [
+    # Revenue patterns
+    (r'Revenue\s+from\s+Operations\s+([\d,]+\.?\d*)', 'revenue'),
+    (r'Revenue\s+from\s+operations\s+([\d,]+\.?\d*)', 'revenue'),
+    (r'Total\s+Income\s+([\d,]+\.?\d*)', 'total_income'),
+    (r'Sales?\s+([\d,]+\.?\d*)', 'sales'),
+    (r'Turnover\s+([\d,]+\.?\d*)', 'turnover'),
+
+    # Profit patterns
+    (r'Profit\s+for\s+the\s+period\s+([\d,]+\.?\d*)', 'pat'),
+    (r'Net\s+Profit\s+([\d,]+\.?\d*)', 'pat'),
+    (r'PAT\s+([\d,]+\.?\d*)', 'pat'),
+    (r'Profit\s+after\s+tax\s+([\d,]+\.?\d*)', 'pat'),
+    (r'Profit\s+before\s+Tax\s+([\d,]+\.?\d*)', 'pbt'),
+    (r'PBT\s+([\d,]+\.?\d*)', 'pbt'),
+    (r'EBITDA\s+([\d,]+\.?\d*)', 'ebitda'),
+
+    # EPS patterns
+    (r'Earnings\s+per\s+share\s+([\d,]+\.?\d*)', 'eps'),
+    (r'EPS\s+([\d,]+\.?\d*)', 'eps'),
+    (r'Basic.*?EPS.*?([\d,]+\.?\d*)', 'eps'),
+
+    # Cost patterns
+    (r'Fuel\s+Cost\s+([\d,]+\.?\d*)', 'fuel_cost'),
+    (r'Employee.*?Cost\s+([\d,]+\.?\d*)', 'employee_cost'),
+    (r'Finance\s+Costs?\s+([\d,]+\.?\d*)', 'finance_cost'),
+    (r'Depreciation\s+([\d,]+\.?\d*)', 'depreciation'),
+
+    # Balance sheet items
+    (r'Total\s+Debt\s+([\d,]+\.?\d*)', 'total_debt'),
+    (r'Borrowings\s+([\d,]+\.?\d*)', 'borrowings'),
+    (r'Cash.*?Balances?\s+([\d,]+\.?\d*)', 'cash_balance'),
+    (r'Net\s+Worth\s+([\d,]+\.?\d*)', 'net_worth'),
+]
@@ -0,0 +1,148 @@
+"""Single-pass keyword scanning and the sentence index the rule extractors run on."""
+import bisect
+import re
+
+from .patterns import PATTERNS
+from .rules import ANNOUNCEMENT_RULES, OPERATION_RULES
+
+# Sentences end at . ! or ? followed by whitespace, or at a blank line
+SENTENCE_BREAK = PATTERNS.compile(r'(?<=[.!?])\s+|\n\s*\n', group='sentence_index')
+
+
+def leading_literal(pattern):
+    """Split a pattern into its leading literal keyword and the rest, e.g. r'legal.*case' -> ('legal', '.*case')"""
+    literal = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            literal.append(pattern[i + 1])
+            i += 2
+        elif char.isalnum() or char in " '-":
+            literal.append(char)
+            i += 1
+        else:
+            break
+    return ''.join(literal).lower(), pattern[i:]
+
+
+def keyword_trie_pattern(keywords):
+    """Build an alternation factored by common prefixes, which re scans much faster"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class KeywordScanner:
+    """Find every trigger keyword of a rule set in a single pass over the text"""
+
+    def __init__(self, patterns, flags=re.IGNORECASE):
+        """patterns are (pattern, flags, group) with group naming the rule in the pattern report"""
+        self.keywords = {}
+        self.required = {}
+        self.compiled = {}
+        for pattern, pattern_flags, group in patterns:
+            keyword, rest = leading_literal(pattern)
+            if not keyword:
+                raise ValueError(f"Pattern has no leading keyword: {pattern!r}")
+            self.keywords[pattern] = keyword
+            self.compiled[pattern] = PATTERNS.compile(pattern, pattern_flags, group=group)
+
+            # 'A.*B...' can only match where both A and B occur
+            self.required[pattern] = [keyword]
+            if rest.startswith('.*'):
+                second, _ = leading_literal(rest[2:].lstrip('?'))
+                if second:
+                    self.required[pattern].append(second)
+
+        self.all_keywords = {keyword for keywords in self.required.values() for keyword in keywords}
+        self.trigger = PATTERNS.compile('(?=(' + keyword_trie_pattern(self.all_keywords) + '))', flags,
+                                        group='keyword_scan')
+
+        # Any other keyword found at the same position is a prefix of the match
+        self.prefixes = {
+            keyword: [k for k in self.all_keywords if keyword.startswith(k)]
+            for keyword in self.all_keywords
+        }
+
+    def scan(self, text):
+        """Map each keyword to the sorted positions where it occurs"""
+        hits = {keyword: [] for keyword in self.all_keywords}
+        for match in self.trigger.finditer(text):
+            for keyword in self.prefixes[match.group(1).casefold()]:
+                hits[keyword].append(match.start())
+        return hits
+
+    def finditer(self, pattern, text, hits):
+        """Same matches as re.finditer(pattern, text), only tried at keyword hits"""
+        regex = self.compiled[pattern]
+        last_end = 0
+        for pos in hits[self.keywords[pattern]]:
+            if pos < last_end:
+                continue
+            match = regex.match(text, pos)
+            if match:
+                last_end = match.end()
+                yield match
+
+
+class SentenceIndex:
+    """Sentence boundaries of a document and an inverted index from keyword to sentence IDs"""
+
+    def __init__(self, text, scanner):
+        self.text = text
+        self.scanner = scanner
+        self.starts = [0] + [match.end() for match in SENTENCE_BREAK.finditer(text)]
+        self.ends = self.starts[1:] + [len(text)]
+
+        # Keyword positions from a single scan, mapped to the sentences containing them
+        self.hits = scanner.scan(text)
+        self.sentence_ids = {}
+        for keyword, positions in self.hits.items():
+            ids = []
+            for pos in positions:
+                sentence_id = bisect.bisect_right(self.starts, pos) - 1
+                if not ids or ids[-1] != sentence_id:
+                    ids.append(sentence_id)
+            self.sentence_ids[keyword] = ids
+
+    def sentence(self, sentence_id):
+        return self.text[self.starts[sentence_id]:self.ends[sentence_id]]
+
+    def candidates(self, pattern):
+        """IDs of the sentences containing every keyword the pattern needs"""
+        keywords = self.scanner.required[pattern]
+        ids = self.sentence_ids[keywords[0]]
+        for keyword in keywords[1:]:
+            ids = sorted(set(ids).intersection(self.sentence_ids[keyword]))
+        return ids
+
+    def finditer(self, pattern):
+        """(offset in the text, match) of a rule pattern: per candidate sentence for DOTALL rules, else over the text"""
+        regex = self.scanner.compiled[pattern]
+        if not regex.flags & re.DOTALL:
+            for match in self.scanner.finditer(pattern, self.text, self.hits):
+                yield match.start(), match
+            return
+        for sentence_id in self.candidates(pattern):
+            for match in regex.finditer(self.sentence(sentence_id)):
+                yield self.starts[sentence_id] + match.start(), match
+
+
+TEXT_SCANNER = KeywordScanner(
+    [(pattern, flags, category) for category, pattern, flags, _ in ANNOUNCEMENT_RULES + OPERATION_RULES]
+)
@@ -0,0 +1,111 @@
+"""Page-level section index of a filing.
+
+Each page is tagged as a financial statement, notes, auditor's report,
+directors' report, press release or other. A section starts at a page whose
+opening lines carry its header and runs until the next header. Pages that
+are mostly rows of amounts are statements wherever they appear. Extractors
+then read only the pages of the sections they need.
+"""
+import re
+from collections import Counter
+
+from .page_extraction import AMOUNT, MIN_AMOUNT_ROWS
+from .patterns import PATTERNS
+
+# Headers are looked for in the first characters of a page
+HEADER_CHARS = 800
+
+SECTION_HEADERS = [
+    ('auditors_report', r"independent\s+auditor|auditor['’]?s['’]?\s+report|limited\s+review\s+report"
+                        r"|review\s+report\s+on"),
+    ('directors_report', r"directors['’]?\s+report|board['’]?s\s+report|report\s+of\s+the\s+(?:board|directors)"
+                         r"|management\s+discussion\s+and\s+analysis|corporate\s+governance\s+report"),
+    ('notes', r"notes\s+to\s+(?:the\s+)?(?:standalone\s+|consolidated\s+)?(?:financial\s+statements|accounts|results)"
+              r"|^\s*notes?\s*:?\s*$"),
+    ('financial_statement', r"statement\s+of\s+profit\s+and\s+loss|balance\s+sheet|statement\s+of\s+cash\s+flows?"
+                            r"|cash\s+flow\s+statement|statement\s+of\s+assets\s+and\s+liabilities"
+                            r"|financial\s+results\s+for\s+the\s+(?:quarter|year|period)"),
+    ('press_release', r"press\s+release|media\s+release|news\s+release|earnings\s+release"),
+    # Annexures and other enclosures end the running section
+    ('other', r"^\s*annexure\b"),
+]
+SECTION_PATTERN = PATTERNS.compile(
+    "|".join(f"(?P<{section}>{pattern})" for section, pattern in SECTION_HEADERS),
+    re.IGNORECASE | re.MULTILINE,
+    group='section_headers',
+)
+
+# Share of a page's lines that must be rows of amounts for it to count as a statement
+STATEMENT_ROW_SHARE = 0.4
+
+# Sections each extractor reads; pages nobody could classify are read by all
+EXTRACTOR_SECTIONS = {
+    'financials': {'financial_statement', 'notes', 'press_release', 'other'},
+    'quarterly_financials': {'financial_statement', 'press_release', 'other'},
+    'announcements': {'notes', 'directors_report', 'press_release', 'other'},
+    'operations': {'notes', 'directors_report', 'press_release', 'other'},
+}
+
+
+def header_section(text):
+    """Section named by the first header in a page's opening lines, or None
+
+    An annexure heading only ends the running section when no other header
+    follows it, as in "Annexure B / Media Release".
+    """
+    found = None
+    for match in SECTION_PATTERN.finditer(text, 0, HEADER_CHARS):
+        if match.lastgroup != 'other':
+            return match.lastgroup
+        found = 'other'
+    return found
+
+
+def is_statement_page(text):
+    """Whether most of a page is rows of amounts"""
+    lines = [line for line in text.split("\n") if line.strip()]
+    rows = sum(1 for line in lines if len(AMOUNT.findall(line)) >= 3)
+    return rows >= MIN_AMOUNT_ROWS and rows >= STATEMENT_ROW_SHARE * len(lines)
+
+
+def page_section(text, current):
+    """Section of one page and the section it carries forward, given the one running into it"""
+    text = text or ""
+    current = header_section(text) or current
+    return ('financial_statement' if is_statement_page(text) else current), current
+
+
+def classify_pages(pages):
+    """Section of every page, carrying each header's section forward"""
+    sections = []
+    current = 'other'
+    for text in pages:
+        section, current = page_section(text, current)
+        sections.append(section)
+    return sections
+
+
+class SectionIndex:
+    """Section of every page of a PageTextStore and the text routed to each extractor"""
+
+    def __init__(self, store):
+        self.store = store
+        self.sections = classify_pages(store)
+        # Routed texts by section set; a spilled store keeps only the latest,
+        # which the announcement and operation extractors share
+        self.routed = {}
+
+    def counts(self):
+        return dict(Counter(self.sections))
+
+    def text_for(self, extractor):
+        """Text of the pages an extractor reads; the whole text when none of them qualify"""
+        wanted = frozenset(EXTRACTOR_SECTIONS[extractor])
+        if wanted in self.routed:
+            return self.routed[wanted]
+        text = self.store.text(i for i, section in enumerate(self.sections) if section in wanted)
+        text = text or self.store.text()
+        if self.store.spilled:
+            self.routed.clear()
+        self.routed[wanted] = text
+        return text
@@ -0,0 +1,420 @@
+"""HTTP analysis service on the standard library's ThreadingHTTPServer.
+
+    python -m finsum.server --port 8000
+
+Endpoints (JSON unless noted; job and result fields are described by
+JOB_SCHEMA, also served at /schema):
+
+    POST /analyses                upload a PDF as the raw body (application/pdf, name
+                                  in ?filename= or X-Filename) or as the 'file' field
+                                  of a multipart form; 202 with the job, or 200 with
+                                  the finished job when ?wait=SECONDS is given and it
+                                  finishes in time; 429 when the queue is full
+    GET  /analyses                every job the service still remembers, without results
+    GET  /analyses/<id>           one job; ?wait=SECONDS blocks until it finishes
+    GET  /analyses/<id>/report    the plain-text report of a finished job
+    GET  /health                  liveness, workers and queue depth
+    GET  /metrics                 Prometheus text: requests, jobs and analysis stages
+    GET  /schema                  JSON Schema of a job
+
+Requests are served on their own threads; analyses run on a JobQueue, so
+the same document uploaded twice is analyzed once and uploads beyond the
+queue limit are turned away with 429 and Retry-After. Finished jobs stay
+retrievable until they are among the oldest beyond the queue's
+max_finished. See finsum.client.ServiceClient for a client.
+"""
+import argparse
+import email.parser
+import email.policy
+import json
+import math
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, QueueFull
+from .metrics import AnalysisMetrics, escape_label, process_rss_mb
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+# Seconds a client is told to wait before retrying a rejected upload
+RETRY_AFTER_SECONDS = 5
+# Longest ?wait= honoured, so a request thread is not held indefinitely
+MAX_WAIT_SECONDS = 300
+
+JOB_PATH = re.compile(r"^/analyses/([0-9a-f]{32})(/report)?$")
+
+PARTIAL_SCHEMA = {
+    'type': ['object', 'null'],
+    'description': "Results of the pages read so far while the job runs",
+    'properties': {
+        'financials': {'type': 'object', 'additionalProperties': {'type': 'string'}},
+        'quarterly_data': {'type': 'object'},
+        'announcements': {'type': 'object', 'additionalProperties': {'type': 'array', 'items': {'type': 'string'}}},
+        'operations': {'type': 'object', 'additionalProperties': {'type': 'array', 'items': {'type': 'string'}}},
+    },
+}
+
+RESULT_SCHEMA = {
+    'type': ['object', 'null'],
+    'description': "AnalysisResult.to_dict() of a finished job, without the report text",
+    'properties': {
+        'filename': {'type': 'string'},
+        'financials': {'type': 'object', 'description': "Metric name to amount as printed, e.g. \"₹10,150 cr\""},
+        'quarterly_data': {'type': 'object', 'description': "Metric name to current / previous period figures"},
+        'announcements': {'type': 'object', 'description': "Category to the distinct snippets found, top_k at most"},
+        'operations': {'type': 'object', 'description': "Category to the distinct snippets found, top_k at most"},
+        'financial_tables': {'type': 'array', 'description': "Statement tables, each a list of rows of cells"},
+        'sections': {'type': 'object', 'description': "Section name to number of pages"},
+        'source_pages': {'type': 'object', 'description': "Page numbers of the hits, shaped like the fields above"},
+        'coverage': {'type': 'object'},
+        'partial': {'type': 'boolean'},
+        'page_hashes': {'type': 'array', 'items': {'type': 'string'}},
+        'diff': {'type': 'object'},
+        'aborted': {'type': 'object', 'description': "Set when a time / memory limit stopped the analysis"},
+        'metrics': {'type': 'object', 'description': "Stage timings, CPU time and the process-wide peak RSS (see AnalysisMetrics)"},
+    },
+}
+
+JOB_SCHEMA = {
+    '$schema': "https://json-schema.org/draft/2020-12/schema",
+    'title': "FinSum analysis job",
+    'type': 'object',
+    'required': ['id', 'filename', 'sha256', 'status', 'progress'],
+    'properties': {
+        'id': {'type': 'string', 'description': "Job ID, used in /analyses/<id>"},
+        'filename': {'type': 'string'},
+        'sha256': {'type': 'string', 'description': "SHA-256 of the uploaded PDF"},
+        'status': {'enum': [QUEUED, RUNNING, DONE, FAILED]},
+        'progress': {'type': 'number', 'minimum': 0, 'maximum': 1},
+        'page': {'type': 'integer', 'description': "Pages analyzed so far"},
+        'page_count': {'type': 'integer'},
+        'queue_position': {'type': 'integer', 'description': "1-based place in the queue, 0 once running"},
+        'submitted': {'type': 'number', 'description': "Unix time"},
+        'started': {'type': ['number', 'null']},
+        'finished': {'type': ['number', 'null']},
+        'error': {'type': ['string', 'null'], 'description': "Why a failed job failed"},
+        'cache_hit': {'type': ['boolean', 'null']},
+        'partial': PARTIAL_SCHEMA,
+        'result': RESULT_SCHEMA,
+    },
+}
+
+
+def default_max_upload_mb():
+    """Largest accepted upload from FINSUM_MAX_UPLOAD_MB"""
+    try:
+        return max(1.0, float(os.environ.get("FINSUM_MAX_UPLOAD_MB", "100")))
+    except ValueError:
+        return 100.0
+
+
+def job_resource(job, queue, with_result=True):
+    """JSON form of a Job, shaped as JOB_SCHEMA"""
+    resource = {
+        'id': job.id,
+        'filename': job.filename,
+        'sha256': job.digest,
+        'status': job.status,
+        'progress': round(job.progress, 4),
+        'page': job.page,
+        'page_count': job.page_count,
+        'queue_position': queue.position(job),
+        'submitted': job.submitted,
+        'started': job.started,
+        'finished': job.finished,
+        'error': job.error,
+        'cache_hit': job.cache_hit,
+    }
+    if with_result:
+        result = None
+        if job.result is not None:
+            result = job.result.to_dict()
+            result.pop('report', None)
+        resource['partial'] = job.partial if job.status in (QUEUED, RUNNING) else None
+        resource['result'] = result
+    return resource
+
+
+def read_upload(content_type, body, query, headers):
+    """(filename, PDF bytes) of a raw or multipart upload; raises ValueError when there is no PDF"""
+    filename = query.get('filename', [None])[0] or headers.get('X-Filename')
+    if content_type.startswith('multipart/form-data'):
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+        )
+        for part in message.iter_parts():
+            if part.get_param('name', header='content-disposition') == 'file':
+                filename = filename or part.get_filename()
+                body = part.get_payload(decode=True) or b""
+                break
+        else:
+            raise ValueError("multipart upload has no 'file' field")
+    # PDF readers accept the header anywhere in the first 1024 bytes
+    if b"%PDF-" not in body[:1024]:
+        raise ValueError("upload is not a PDF")
+    return os.path.basename(filename or "document.pdf"), body
+
+
+class AnalysisService:
+    """The job queue behind the HTTP API, and the counters /metrics reports"""
+
+    def __init__(self, queue=None, max_upload_mb=None):
+        from .analyzer import ComprehensiveFinancialAnalyzer
+
+        self.queue = queue or JobQueue(ComprehensiveFinancialAnalyzer)
+        self.queue.on_finish = self.record_job
+        self.max_upload_bytes = int((max_upload_mb or default_max_upload_mb()) * 1024 * 1024)
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.rejected = 0
+        self.finished = {}
+        self.analysis_seconds = 0.0
+        # Stage timings of every finished analysis, summed
+        self.stages = AnalysisMetrics()
+
+    def record_request(self, method, status):
+        with self.lock:
+            key = (method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def record_rejected(self):
+        with self.lock:
+            self.rejected += 1
+
+    def record_job(self, job):
+        """JobQueue on_finish hook: count the outcome and add the analysis's stage timings"""
+        outcome = job.status
+        if job.status == DONE and job.result.aborted:
+            outcome = 'aborted'
+        with self.lock:
+            self.finished[outcome] = self.finished.get(outcome, 0) + 1
+            self.analysis_seconds += job.finished - job.started
+            if job.result is not None and job.result.metrics:
+                self.stages.add_stages(job.result.metrics['stages'])
+
+    def health(self):
+        stats = self.queue.stats()
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'workers': self.queue.workers,
+            'running': stats[RUNNING],
+            'queued': stats[QUEUED],
+            'max_queued': self.queue.max_queued,
+            'accepting': stats[QUEUED] < self.queue.max_queued,
+        }
+
+    def prometheus(self, prefix="finsum"):
+        """Prometheus text of the service counters followed by the summed stage counters"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.extend(f"{prefix}_{name}{{{labels}}} {value}" if labels else f"{prefix}_{name} {value}"
+                         for labels, value in samples)
+
+        stats = self.queue.stats()
+        with self.lock:
+            requests = sorted(self.requests.items())
+            finished = sorted(self.finished.items())
+            rejected = self.rejected
+            analysis_seconds = self.analysis_seconds
+            stages = self.stages.to_prometheus(prefix) if self.stages.stages else ""
+
+        metric("http_requests_total", "counter", "HTTP requests served by method and status code",
+               [(f'method="{escape_label(method)}",code="{status}"', count) for (method, status), count in requests])
+        metric("uploads_rejected_total", "counter", "Uploads turned away with 429 because the queue was full",
+               [("", rejected)])
+        metric("jobs", "gauge", "Jobs the service remembers by status",
+               [(f'status="{status}"', count) for status, count in stats.items()])
+        metric("job_workers", "gauge", "Analyses that can run at the same time", [("", self.queue.workers)])
+        metric("queue_capacity", "gauge", "Uploads allowed to wait for a worker", [("", self.queue.max_queued)])
+        metric("analyses_total", "counter", "Finished analyses by outcome",
+               [(f'outcome="{outcome}"', count) for outcome, count in finished])
+        metric("analysis_seconds_total", "counter", "Wall-clock seconds spent running analyses",
+               [("", f"{analysis_seconds:.3f}")])
+        rss_mb = process_rss_mb()
+        if rss_mb is not None:
+            metric("process_resident_megabytes", "gauge", "Resident memory of the service process",
+                   [("", f"{rss_mb:.1f}")])
+        return "\n".join(lines) + "\n" + stages
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    """Routes requests to the AnalysisService of the server"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "FinSum"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def send_response(self, code, message=None):
+        self.service.record_request(self.command, code)
+        super().send_response(code, message)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_body(status, body, "application/json; charset=utf-8", headers)
+
+    def send_problem(self, status, message, headers=None):
+        self.send_json(status, {'error': message, 'status': status}, headers)
+
+    def wait_seconds(self, query):
+        """?wait= as seconds, capped at MAX_WAIT_SECONDS; 0 when absent or not a number"""
+        try:
+            seconds = float(query.get('wait', ['0'])[0])
+        except ValueError:
+            return 0.0
+        return min(seconds, MAX_WAIT_SECONDS) if math.isfinite(seconds) and seconds > 0 else 0.0
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        queue = self.service.queue
+
+        if url.path == "/health":
+            self.send_json(200, self.service.health())
+        elif url.path == "/metrics":
+            self.send_body(200, self.service.prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        elif url.path == "/schema":
+            self.send_json(200, JOB_SCHEMA)
+        elif url.path == "/analyses":
+            with queue.condition:
+                jobs = list(queue.jobs.values())
+            self.send_json(200, {'jobs': [job_resource(job, queue, with_result=False) for job in jobs]})
+        elif JOB_PATH.match(url.path):
+            job_id, report = JOB_PATH.match(url.path).groups()
+            job = queue.get(job_id)
+            if job is None:
+                self.send_problem(404, "no such analysis; finished jobs are forgotten after a while")
+                return
+            wait = self.wait_seconds(query)
+            if wait:
+                queue.wait(job, wait)
+            if not report:
+                self.send_json(200, job_resource(job, queue))
+            elif job.status == DONE:
+                self.send_body(200, job.result.report.encode("utf-8"), "text/plain; charset=utf-8")
+            else:
+                self.send_problem(409, f"the analysis is {job.status}, the report is not available")
+        else:
+            self.send_problem(404, "not found")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/analyses":
+            self.close_connection = True
+            self.send_problem(404, "not found")
+            return
+
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            self.close_connection = True
+            self.send_problem(411, "Content-Length is required")
+            return
+        if int(length) > self.service.max_upload_bytes:
+            # The body is not read, so the connection cannot be reused
+            self.close_connection = True
+            self.send_problem(413, f"uploads are limited to {self.service.max_upload_bytes // (1024 * 1024)} MB")
+            return
+        body = self.rfile.read(int(length))
+
+        query = parse_qs(url.query)
+        try:
+            filename, data = read_upload(self.headers.get("Content-Type", ""), body, query, self.headers)
+        except ValueError as e:
+            self.send_problem(400, str(e))
+            return
+
+        queue = self.service.queue
+        try:
+            job = queue.submit(data, filename)
+        except QueueFull as e:
+            self.service.record_rejected()
+            self.send_problem(429, f"the analyzer is busy ({e}), retry later",
+                              {"Retry-After": str(RETRY_AFTER_SECONDS)})
+            return
+
+        wait = self.wait_seconds(query)
+        if wait:
+            queue.wait(job, wait)
+        status = 200 if job.status in (DONE, FAILED) else 202
+        self.send_json(status, job_resource(job, queue), {"Location": f"/analyses/{job.id}"})
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer serving one AnalysisService"""
+
+    daemon_threads = True
+
+    def __init__(self, address, service=None, quiet=False):
+        self.service = service or AnalysisService()
+        self.quiet = quiet
+        super().__init__(address, AnalysisHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(host=DEFAULT_HOST, port=0, service=None, quiet=True):
+    """Serve on a background thread and return the server; port 0 picks a free port, see server.url"""
+    server = AnalysisServer((host, port), service, quiet)
+    thread = threading.Thread(target=server.serve_forever, name="finsum-http", daemon=True)
+    thread.start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the FinSum analyzer over HTTP")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="analyses run at the same time (default FINSUM_JOB_WORKERS)")
+    parser.add_argument('--max-queued', type=int, default=None,
+                        help="uploads allowed to wait before 429 (default FINSUM_MAX_QUEUED)")
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help="seconds per document, run in a supervised subprocess (default FINSUM_TIME_LIMIT)")
+    parser.add_argument('--memory-limit', type=float, default=None,
+                        help="resident MB per document, run in a supervised subprocess (default FINSUM_MEMORY_LIMIT_MB)")
+    parser.add_argument('--quiet', action='store_true', help="do not log every request")
+    args = parser.parse_args(argv)
+
+    from .analyzer import ComprehensiveFinancialAnalyzer
+
+    queue = JobQueue(ComprehensiveFinancialAnalyzer, workers=args.workers, max_queued=args.max_queued,
+                     time_limit=args.time_limit, memory_limit_mb=args.memory_limit)
+    server = AnalysisServer((args.host, args.port), AnalysisService(queue), args.quiet)
+    print(f"🌐 FinSum API on {server.url} ({queue.workers} workers, {queue.max_queued} queued at most)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Shutting down")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""PDF sources: a file path, the PDF bytes, or a binary file-like object.
+
+Uploads are analyzed straight from memory. Only uploads above the spool
+threshold, and parallel extraction (worker processes open the PDF by path),
+go through a temporary file, which is unique per call and always removed.
+"""
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+
+DEFAULT_SPOOL_MB = 32
+
+
+def default_spool_bytes():
+    """Spool threshold from FINSUM_SPOOL_MB"""
+    try:
+        spool_mb = float(os.environ.get("FINSUM_SPOOL_MB", DEFAULT_SPOOL_MB))
+    except ValueError:
+        spool_mb = DEFAULT_SPOOL_MB
+    return int(spool_mb * 1024 * 1024)
+
+
+def as_source(source):
+    """A path (str) or the PDF bytes; file-like objects are read into memory"""
+    if isinstance(source, os.PathLike):
+        return os.fspath(source)
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        source.seek(0)
+        return source.read()
+    return source
+
+
+def source_name(source, default="document.pdf"):
+    """File name to show for a source"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(os.fspath(source))
+    name = getattr(source, 'name', None)
+    return os.path.basename(name) if isinstance(name, str) else default
+
+
+def pdf_stream(source):
+    """What pdfplumber.open takes for a source: the path, or a stream over the bytes"""
+    return source if isinstance(source, str) else io.BytesIO(source)
+
+
+@contextmanager
+def spooled(source, spool_bytes=0):
+    """Yield a source to analyze: in-memory bytes up to spool_bytes, else a path
+
+    Bytes above the threshold are written to a private temporary file that
+    is removed on exit, also when the analysis raises.
+    """
+    source = as_source(source)
+    if isinstance(source, str) or len(source) <= spool_bytes:
+        yield source
+        return
+    fd, path = tempfile.mkstemp(prefix="finsum-upload-", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(source)
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
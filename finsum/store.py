@@ -0,0 +1,181 @@
+"""Columnar store of analysis results for historical queries.
+
+Every analyzed document is written once as two small Parquet files,
+partitioned by company and period (hive layout) and named by the SHA-256
+of the PDF:
+
+    metrics/company=ACME/period=2024-12-31/<sha256>.parquet     one row per metric
+    documents/company=ACME/period=2024-12-31/<sha256>.parquet   file name, financials, lists as JSON
+
+index/<sha256> holds the partition a document was stored under. Reads go
+through pyarrow datasets, so a filter on company or period only opens the
+matching directories, and nothing is parsed from the PDFs again.
+Periods sort as strings: use labels such as "2024-12-31" or "2024Q4".
+
+Both tables are written and read with fixed schemas (SCHEMAS), so a
+document without metric rows or without a page count does not leave a
+file of null-typed columns that every later read would fail to merge.
+"""
+import json
+import os
+import time
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .frame import add_changes, as_record, default_company, metric_rows, rows_frame
+
+TABLES = ('metrics', 'documents')
+UNKNOWN_PERIOD = 'unknown'
+# Document fields kept as JSON strings in the documents table
+JSON_FIELDS = ['financials', 'quarterly_data', 'announcements', 'operations', 'source_pages', 'coverage']
+
+PARTITION_FIELDS = [pa.field('company', pa.string()), pa.field('period', pa.string())]
+SCHEMAS = {
+    'metrics': pa.schema(
+        [pa.field('sha256', pa.string()), pa.field('document', pa.string()), pa.field('metric', pa.string()),
+         pa.field('source', pa.string())]
+        + [pa.field(column, pa.float64())
+           for column in ['current', 'previous_q', 'previous_year', 'qoq_change', 'yoy_change', 'analyzed_at']]
+    ),
+    'documents': pa.schema(
+        [pa.field('sha256', pa.string()), pa.field('document', pa.string()), pa.field('mode', pa.string()),
+         pa.field('page_count', pa.int64()), pa.field('analyzed_at', pa.float64())]
+        + [pa.field(name, pa.string()) for name in JSON_FIELDS]
+    ),
+}
+
+
+def write_text(path, text):
+    with open(path, 'w', encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_table(frame, table, path):
+    """Write a frame as Parquet with the table's schema"""
+    pq.write_table(pa.Table.from_pandas(frame, schema=SCHEMAS[table], preserve_index=False), path)
+
+
+def partition(name, value):
+    return f"{name}={quote(str(value), safe='')}"
+
+
+class FilingStore:
+    """Parquet files of analyzed filings, keyed by document SHA-256, company and period"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def location(self, company, period):
+        return os.path.join(partition('company', company), partition('period', period))
+
+    def path(self, table, location, digest):
+        return os.path.join(self.root, table, location, f"{digest}.parquet")
+
+    def index_path(self, digest):
+        return os.path.join(self.root, 'index', digest)
+
+    def stored_location(self, digest):
+        """Partition directory (company=.../period=...) a digest is stored under, or None"""
+        try:
+            with open(self.index_path(digest), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, digest):
+        return self.stored_location(digest) is not None
+
+    def put(self, result, digest, company=None, period=None):
+        """Store an AnalysisResult, its to_dict() or a batch.py record; replaces the digest's earlier entry"""
+        record = as_record(result)
+        company = company or default_company(record)
+        period = period or record.get('period') or UNKNOWN_PERIOD
+        location = self.location(company, period)
+        analyzed_at = time.time()
+
+        metrics = add_changes(rows_frame(metric_rows([record], lambda _: company, lambda _: period)))
+        metrics = metrics.drop(columns=['company', 'period'])
+        metrics.insert(0, 'sha256', digest)
+        metrics['analyzed_at'] = analyzed_at
+
+        document = {
+            'sha256': digest,
+            'document': record.get('filename') or record.get('path'),
+            'mode': record.get('mode', 'quick' if record.get('coverage') else 'full'),
+            'page_count': len(record.get('page_hashes') or []) or (record.get('coverage') or {}).get('page_count'),
+            'analyzed_at': analyzed_at,
+        }
+        document.update({name: json.dumps(record.get(name) or {}, ensure_ascii=False) for name in JSON_FIELDS})
+
+        # A document relabelled with another company or period is not kept twice
+        if self.stored_location(digest) not in (None, location):
+            self.delete(digest)
+        self.write_file(self.path('metrics', location, digest), lambda path: write_table(metrics, 'metrics', path))
+        self.write_file(self.path('documents', location, digest),
+                        lambda path: write_table(pd.DataFrame([document]), 'documents', path))
+        self.write_file(self.index_path(digest), lambda path: write_text(path, location))
+
+    def write_file(self, path, write):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Readers skip dot files, so a half-written file is never seen
+        tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def delete(self, digest):
+        location = self.stored_location(digest)
+        if location is None:
+            return
+        for table in TABLES:
+            path = self.path(table, location, digest)
+            if os.path.exists(path):
+                os.remove(path)
+        os.remove(self.index_path(digest))
+
+    def read(self, table, columns=None, **filters):
+        """Rows of a table; filters are column=value or column=[values], None for no filter"""
+        directory = os.path.join(self.root, table)
+        if not os.path.isdir(directory):
+            return pd.DataFrame(columns=columns)
+        conditions = [
+            (column, 'in', list(value)) if isinstance(value, (list, tuple, set)) else (column, '==', value)
+            for column, value in filters.items() if value is not None
+        ]
+        schema = pa.schema(list(SCHEMAS[table]) + PARTITION_FIELDS)
+        partitioning = ds.partitioning(pa.schema(PARTITION_FIELDS), flavor='hive')
+        return pq.read_table(directory, columns=columns, filters=conditions or None, schema=schema,
+                             partitioning=partitioning).to_pandas()
+
+    def metrics(self, company=None, period=None, metric=None, columns=None):
+        """Metric rows filtered by company, period and metric, each a value or a list of values"""
+        return self.read('metrics', columns=columns, company=company, period=period, metric=metric)
+
+    def documents(self, company=None, period=None, columns=None):
+        """Document rows, with the JSON fields decoded"""
+        frame = self.read('documents', columns=columns, company=company, period=period)
+        for name in JSON_FIELDS:
+            if name in frame:
+                frame[name] = frame[name].map(json.loads)
+        return frame
+
+    def history(self, company, metric):
+        """One metric of a company over its stored periods, oldest first, the latest analysis per period"""
+        frame = self.metrics(company=company, metric=metric)
+        frame = frame.sort_values(['period', 'analyzed_at']).drop_duplicates('period', keep='last')
+        return frame.reset_index(drop=True)
+
+    def get(self, digest):
+        """The stored document row of a digest as a dict, or None"""
+        location = self.stored_location(digest)
+        if location is None:
+            return None
+        record = pq.read_table(self.path('documents', location, digest), schema=SCHEMAS['documents']).to_pylist()[0]
+        company, period = location.split(os.sep)
+        record['company'] = unquote(company.split('=', 1)[1])
+        record['period'] = unquote(period.split('=', 1)[1])
+        record.update({name: json.loads(record[name]) for name in JSON_FIELDS})
+        return record
@@ -0,0 +1,196 @@
+"""On-disk cache of extracted PDF text and tables, keyed by the SHA-256 of the PDF bytes.
+
+Entries live in a single SQLite file as zlib-compressed JSON. Pages are also
+stored on their own: the text keyed by the page's content (see
+page_extraction.page_content_key) and the tables keyed by the page text, so
+the unchanged pages of a revised filing are not parsed or searched again.
+When the total size goes over the limit the least recently used entries are
+evicted.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+
+# Bump when extraction output changes so stale entries are not served
+CACHE_FORMAT = 2
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "finsum")
+DEFAULT_MAX_MB = 512
+
+# Per-page entry tables, evicted together with the documents
+PAGE_TABLES = ('page_texts', 'page_tables')
+
+
+def file_digest(pdf_path):
+    """SHA-256 of a file, read in chunks, or of PDF bytes already in memory"""
+    if isinstance(pdf_path, bytes):
+        return hashlib.sha256(pdf_path).hexdigest()
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache():
+    """Cache configured from FINSUM_CACHE_DIR / FINSUM_CACHE_MAX_MB, None when FINSUM_CACHE=off"""
+    if os.environ.get("FINSUM_CACHE", "on").lower() in ("0", "off", "false", "no"):
+        return None
+    cache_dir = os.environ.get("FINSUM_CACHE_DIR", DEFAULT_CACHE_DIR)
+    try:
+        max_mb = float(os.environ.get("FINSUM_CACHE_MAX_MB", DEFAULT_MAX_MB))
+    except ValueError:
+        max_mb = DEFAULT_MAX_MB
+    return PDFTextCache(os.path.join(cache_dir, "text_cache.sqlite3"), max_bytes=int(max_mb * 1024 * 1024))
+
+
+class PDFTextCache:
+    """Per-page text and financial tables of previously parsed PDFs"""
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " digest TEXT PRIMARY KEY,"
+                " format INTEGER NOT NULL,"
+                " data BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            for table in PAGE_TABLES:
+                db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    " key TEXT PRIMARY KEY,"
+                    " format INTEGER NOT NULL,"
+                    " data BLOB NOT NULL,"
+                    " size INTEGER NOT NULL,"
+                    " last_access REAL NOT NULL)"
+                )
+            db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            db.execute("INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0), ('evictions', 0)")
+
+    @contextmanager
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, digest):
+        """Return {'pages': [...], 'tables': [...]} for a digest, or None on a miss"""
+        with self.connect() as db:
+            row = db.execute(
+                "SELECT data FROM documents WHERE digest = ? AND format = ?", (digest, CACHE_FORMAT)
+            ).fetchone()
+            if row is None:
+                db.execute("UPDATE stats SET value = value + 1 WHERE name = 'misses'")
+                return None
+            db.execute("UPDATE documents SET last_access = ? WHERE digest = ?", (time.time(), digest))
+            db.execute("UPDATE stats SET value = value + 1 WHERE name = 'hits'")
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, digest, pages, tables):
+        """Store the page texts and table entries of a document, then evict down to the size limit"""
+        data = zlib.compress(json.dumps({'pages': pages, 'tables': tables}).encode("utf-8"))
+        if len(data) > self.max_bytes:
+            return
+        with self.connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)",
+                (digest, CACHE_FORMAT, data, len(data), time.time()),
+            )
+            self.evict(db)
+
+    def get_page_text(self, key):
+        """Text cached for a page content key (see page_extraction.page_content_key), or None"""
+        return self.get_page_entry('page_texts', key)
+
+    def put_page_text(self, key, text):
+        self.put_page_entry('page_texts', key, text)
+
+    def get_page_tables(self, key):
+        """Tables cached for a page key (see page_extraction.page_table_key), or None"""
+        return self.get_page_entry('page_tables', key)
+
+    def put_page_tables(self, key, tables):
+        self.put_page_entry('page_tables', key, tables)
+
+    def get_page_entry(self, table, key):
+        with self.connect() as db:
+            row = db.execute(
+                f"SELECT data FROM {table} WHERE key = ? AND format = ?", (key, CACHE_FORMAT)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(f"UPDATE {table} SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def put_page_entry(self, table, key, value):
+        data = zlib.compress(json.dumps(value).encode("utf-8"))
+        with self.connect() as db:
+            db.execute(
+                f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?, ?)",
+                (key, CACHE_FORMAT, data, len(data), time.time()),
+            )
+            self.evict(db)
+
+    def evict(self, db):
+        sizes = " + ".join(f"(SELECT COALESCE(SUM(size), 0) FROM {table})" for table in ('documents',) + PAGE_TABLES)
+        total = db.execute(f"SELECT {sizes}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        pages = "".join(f" UNION ALL SELECT '{table}', key, size, last_access FROM {table}" for table in PAGE_TABLES)
+        entries = db.execute(
+            f"SELECT 'documents', digest, size, last_access FROM documents{pages} ORDER BY last_access"
+        ).fetchall()
+        for table, key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            column = 'digest' if table == 'documents' else 'key'
+            db.execute(f"DELETE FROM {table} WHERE {column} = ?", (key,))
+            total -= size
+            evicted += 1
+        db.execute("UPDATE stats SET value = value + ? WHERE name = 'evictions'", (evicted,))
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self.connect() as db:
+            counters = dict(db.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM documents").fetchone()
+            page_entries, page_size = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM page_tables"
+            ).fetchone()
+            text_entries, text_size = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM page_texts"
+            ).fetchone()
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'hit_rate': counters['hits'] / lookups if lookups else 0.0,
+            'evictions': counters['evictions'],
+            'entries': entries,
+            'page_table_entries': page_entries,
+            'page_text_entries': text_entries,
+            'size_bytes': size + page_size + text_size,
+            'max_bytes': self.max_bytes,
+        }
+
+    def clear(self):
+        with self.connect() as db:
+            db.execute("DELETE FROM documents")
+            for table in PAGE_TABLES:
+                db.execute(f"DELETE FROM {table}")
+            db.execute("UPDATE stats SET value = 0")
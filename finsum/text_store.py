@@ -0,0 +1,167 @@
+"""Per-page text of a document, optionally spilled to a memory-mapped file.
+
+Pages are appended as they are extracted and joined when the text is
+needed, instead of growing one string page by page. Past a size threshold
+the pages move to a temporary file and are read back through mmap. A
+spilled store keeps no joined text of its own: every text() call joins
+the pages afresh, and the copy lives only as long as its caller holds it.
+Spilling bounds what stays resident between analyses, not the peak of
+one: the extractors still hold the joined text of the pages they read.
+Joined text is a PageText: a str that also knows which page each character
+offset falls on, so extractors can report where a hit came from.
+"""
+import bisect
+import mmap
+import os
+import tempfile
+
+DEFAULT_SPILL_MB = 64
+
+
+def default_spill_bytes():
+    """Spill threshold from FINSUM_SPILL_MB; 0 keeps every page in memory"""
+    try:
+        spill_mb = float(os.environ.get("FINSUM_SPILL_MB", DEFAULT_SPILL_MB))
+    except ValueError:
+        spill_mb = DEFAULT_SPILL_MB
+    return int(spill_mb * 1024 * 1024)
+
+
+class PageText(str):
+    """Joined page texts that map character offsets back to page numbers"""
+
+    def __new__(cls, text, starts=(), page_numbers=()):
+        self = super().__new__(cls, text)
+        self.starts = list(starts)
+        self.page_numbers = list(page_numbers)
+        # The PageTextStore this is the whole text of, if any
+        self.store = None
+        return self
+
+    @classmethod
+    def join(cls, pages):
+        """Join (page number, text) pairs the way the analyzer always has: non-empty pages, newline-terminated"""
+        parts = []
+        starts = []
+        page_numbers = []
+        offset = 0
+        for page_number, text in pages:
+            if not text:
+                continue
+            starts.append(offset)
+            page_numbers.append(page_number)
+            parts.append(text)
+            parts.append("\n")
+            offset += len(text) + 1
+        return cls("".join(parts), starts, page_numbers)
+
+    def page_of(self, offset):
+        """1-based page number of a character offset, None when unknown"""
+        i = bisect.bisect_right(self.starts, offset) - 1
+        return self.page_numbers[i] if i >= 0 else None
+
+
+def page_of(text, offset):
+    """Page number of an offset in text, None for plain strings"""
+    return text.page_of(offset) if isinstance(text, PageText) else None
+
+
+class PageTextStore:
+    """Text of every page of one document, in memory or in a spill file"""
+
+    def __init__(self, spill_bytes=None):
+        self.spill_bytes = default_spill_bytes() if spill_bytes is None else spill_bytes
+        self.pages = []
+        self.spans = []
+        self.characters = 0
+        # Length of the joined text: every non-empty page plus its newline
+        self.text_length = 0
+        self.file = None
+        self.map = None
+        self.full_text = None
+
+    @classmethod
+    def from_pages(cls, pages, spill_bytes=None):
+        store = cls(spill_bytes)
+        for text in pages:
+            store.append(text)
+        return store
+
+    @property
+    def spilled(self):
+        return self.file is not None
+
+    def __len__(self):
+        return len(self.spans) if self.spilled else len(self.pages)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.page(index)
+
+    def append(self, text):
+        text = text or ""
+        self.characters += len(text)
+        self.text_length += len(text) + 1 if text else 0
+        self.full_text = None
+        if not self.spilled and self.spill_bytes and self.characters > self.spill_bytes:
+            self.spill()
+        if self.spilled:
+            self.write(text)
+        else:
+            self.pages.append(text)
+
+    def spill(self):
+        """Move the pages collected so far into a temporary file"""
+        self.file = tempfile.TemporaryFile(prefix="finsum-pages-")
+        pages, self.pages = self.pages, []
+        for text in pages:
+            self.write(text)
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        start = self.file.seek(0, os.SEEK_END)
+        self.file.write(data)
+        self.spans.append((start, start + len(data)))
+
+    def page(self, index):
+        """Text of one page (0-based)"""
+        if not self.spilled:
+            return self.pages[index]
+        start, end = self.spans[index]
+        if start == end:
+            return ""
+        if self.map is None or len(self.map) < end:
+            self.file.flush()
+            if self.map is not None:
+                self.map.close()
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map[start:end].decode("utf-8")
+
+    def text(self, indexes=None):
+        """PageText of the given pages (0-based), or of the whole document
+
+        The whole text is kept for later calls unless the store is spilled.
+        """
+        if indexes is not None:
+            return PageText.join((i + 1, self.page(i)) for i in indexes)
+        if self.full_text is not None:
+            return self.full_text
+        text = PageText.join((i + 1, text) for i, text in enumerate(self))
+        text.store = self
+        if not self.spilled:
+            self.full_text = text
+        return text
+
+    def is_text(self, text):
+        """Whether text is the whole text of this store"""
+        if getattr(text, 'store', None) is self:
+            return True
+        # An equal string from elsewhere; only join the pages when the length matches
+        return len(text) == self.text_length and text == self.text()
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
@@ -0,0 +1,189 @@
+"""Supervised analysis: one document per subprocess, within time and memory limits.
+
+The analysis runs in a child process that reports every page and every
+finished stage back over a pipe. The parent checks the elapsed time and
+the resident memory of the child and its page-extraction workers while it
+waits; when a limit is crossed, or the child dies, the child and its
+workers are killed and the result holds the stages completed so far, with result.aborted naming the stage that was cut short and why.
+A malformed PDF or a runaway pattern then costs one limit's worth of time
+instead of a stuck worker.
+"""
+import os
+import signal
+import time
+
+from .analyzer import ANALYSIS_STAGES, AnalysisResult, ComprehensiveFinancialAnalyzer
+from .metrics import descendant_pids, process_tree_rss_mb
+from .page_extraction import process_context
+from .sources import as_source, source_name
+
+# Stages in run order; a limit hit aborts the first one not finished
+STAGES = ['extraction'] + [field_name for field_name, _, _ in ANALYSIS_STAGES] + ['report']
+POLL_SECONDS = 0.05
+
+ABORT_MESSAGES = {
+    'time_limit': "exceeded the {limit:g}s time limit",
+    'memory_limit': "exceeded the {limit:g} MB memory limit",
+    'crashed': "the analysis process exited with code {limit}",
+    'error': "{limit}",
+}
+
+
+def default_time_limit():
+    """Seconds one document may take from FINSUM_TIME_LIMIT, None for no limit"""
+    try:
+        limit = float(os.environ.get("FINSUM_TIME_LIMIT", "0"))
+    except ValueError:
+        return None
+    return limit if limit > 0 else None
+
+
+def default_memory_limit_mb():
+    """Resident memory one analysis may use from FINSUM_MEMORY_LIMIT_MB, None for no limit"""
+    try:
+        limit = float(os.environ.get("FINSUM_MEMORY_LIMIT_MB", "0"))
+    except ValueError:
+        return None
+    return limit if limit > 0 else None
+
+
+def run_child(conn, source, filename, analyzer_options, preview):
+    """Child process: analyze and send ('page', update), ('stage', field, value), then ('result', result)"""
+    try:
+        analyzer = ComprehensiveFinancialAnalyzer(**analyzer_options)
+
+        def stage_done(field_name, value):
+            conn.send(('stage', field_name, value))
+
+        if preview:
+            result = None
+            for update in analyzer.analyze_incremental(source, filename, progress=stage_done):
+                if update['done']:
+                    result = update['result']
+                else:
+                    conn.send(('page', update))
+        else:
+            for page_number, page_count, _ in analyzer.iter_pages(source):
+                conn.send(('page', {'page': page_number, 'page_count': page_count}))
+            if not analyzer.text_store.text_length:
+                raise ValueError("could not read PDF")
+            result = analyzer.analyze_text(filename, None, progress=stage_done)
+        conn.send(('result', result))
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def analyze_supervised(source, filename=None, time_limit=None, memory_limit_mb=None,
+                       analyzer_options=None, preview=False, on_update=None):
+    """Analyze a PDF (path or bytes) in a subprocess and return its AnalysisResult
+
+    time_limit (seconds) and memory_limit_mb default to FINSUM_TIME_LIMIT and
+    FINSUM_MEMORY_LIMIT_MB. With preview, the child also runs the extractors
+    page by page (see analyze_incremental) and on_update gets those updates;
+    otherwise on_update gets {'page', 'page_count'} per page. A result cut
+    short by a limit has partial=True and result.aborted set; its fields come
+    from the stages that finished, or else the last preview.
+    """
+    source = as_source(source)
+    filename = filename or source_name(source)
+    time_limit = time_limit or default_time_limit()
+    memory_limit_mb = memory_limit_mb or default_memory_limit_mb()
+
+    context = process_context()
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    # Not daemonic: with FINSUM_WORKERS>1 the child starts its own page-extraction pool
+    process = context.Process(target=run_child, args=(child_conn, source, filename, analyzer_options or {}, preview))
+    start = time.perf_counter()
+    process.start()
+    child_conn.close()
+
+    completed = {}
+    preview_update = {}
+    progress = {'page': 0, 'page_count': 0}
+    peak_rss_mb = 0.0
+    result = None
+    reason = limit = None
+    try:
+        while True:
+            if parent_conn.poll(POLL_SECONDS):
+                try:
+                    message = parent_conn.recv()
+                except EOFError:
+                    message = None
+                if message is None:
+                    process.join(1)
+                    reason, limit = 'crashed', process.exitcode
+                    break
+                kind = message[0]
+                if kind == 'page':
+                    update = message[1]
+                    progress = {'page': update['page'], 'page_count': update['page_count']}
+                    if preview:
+                        preview_update = update
+                    if on_update is not None:
+                        on_update(update)
+                elif kind == 'stage':
+                    completed[message[1]] = message[2]
+                elif kind == 'result':
+                    result = message[1]
+                    break
+                elif kind == 'error':
+                    reason, limit = 'error', message[1]
+                    break
+
+            rss_mb = process_tree_rss_mb(process.pid)
+            if rss_mb is not None:
+                peak_rss_mb = max(peak_rss_mb, rss_mb)
+            if time_limit and time.perf_counter() - start > time_limit:
+                reason, limit = 'time_limit', time_limit
+                break
+            if memory_limit_mb and rss_mb is not None and rss_mb > memory_limit_mb:
+                reason, limit = 'memory_limit', memory_limit_mb
+                break
+            if not process.is_alive() and not parent_conn.poll():
+                reason, limit = 'crashed', process.exitcode
+                break
+    finally:
+        if process.is_alive():
+            # Workers are taken first; once the child is gone they can no longer be found through it
+            workers = descendant_pids(process.pid)
+            process.kill()
+            for pid in workers:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+        process.join()
+        parent_conn.close()
+
+    if result is not None:
+        return result
+
+    # A child that read no text at all failed rather than being cut short
+    if reason == 'error' and not completed and not progress['page_count']:
+        raise RuntimeError(limit)
+
+    # Stages with nothing to show get the extractor's empty result, so every category key is there
+    analyzer = ComprehensiveFinancialAnalyzer(cache=False)
+    result = AnalysisResult(filename=filename, partial=True)
+    for field_name, extractor, _ in ANALYSIS_STAGES:
+        value = completed.get(field_name, preview_update.get(field_name))
+        setattr(result, field_name, value if value else getattr(analyzer, extractor)(""))
+    done = ['extraction'] if completed or progress['page'] == progress['page_count'] > 0 else []
+    done += [stage for stage in STAGES[1:-1] if stage in completed]
+    stage = next(stage for stage in STAGES if stage not in done)
+    result.aborted = {
+        'stage': stage,
+        'reason': reason,
+        'message': ABORT_MESSAGES[reason].format(limit=limit),
+        'completed': done,
+        'page': progress['page'],
+        'page_count': progress['page_count'],
+        'elapsed_seconds': round(time.perf_counter() - start, 3),
+        'peak_rss_mb': round(peak_rss_mb, 1),
+    }
+    result.report = analyzer.render_report(result)
+    print(f"⚠️ {filename}: stopped during {stage}, {result.aborted['message']}")
+    return result
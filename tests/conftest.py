@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "benchmarks"))
+
+from synthetic import synthetic_pages, write_pdf  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def synthetic_pdf(tmp_path_factory):
+    """Path of a 10-page synthetic filing (see benchmarks/synthetic.py)"""
+    path = tmp_path_factory.mktemp("pdf") / "synthetic.pdf"
+    write_pdf(synthetic_pages(10), str(path))
+    return str(path)
@@ -0,0 +1,33 @@
+from finsum.dedup import TopSnippets
+
+
+def test_match_over_a_kept_span_adds_a_hit_and_keeps_the_longer_text():
+    snippets = TopSnippets(top_k=5)
+    snippets.add("Acquired Stratatech Mineral Resources", 100, 137, page=4)
+    snippets.add("Acquired Stratatech Mineral Resources Pvt Ltd", 100, 145, page=4)
+    assert snippets.texts() == ["Acquired Stratatech Mineral Resources Pvt Ltd"]
+    assert snippets.duplicates == 1
+    assert snippets.kept[0].hits == 2
+
+
+def test_repeated_sentence_elsewhere_is_a_duplicate_unless_its_figures_differ():
+    snippets = TopSnippets(top_k=5)
+    snippets.add("The board declared an interim dividend of 5 per share", 0, 53)
+    snippets.add("The board declared an interim dividend of 5 per share.", 900, 954)
+    snippets.add("The board declared an interim dividend of 7 per share", 2000, 2053)
+    assert snippets.duplicates == 1
+    assert len(snippets.kept) == 2
+
+
+def test_keeps_at_most_top_k_ranked_by_hits_then_position():
+    snippets = TopSnippets(top_k=3)
+    for i in range(10):
+        snippets.add(f"Order number {i} received from customer {chr(65 + i)}", i * 100, i * 100 + 40, page=i + 1)
+    snippets.add("Order number 2 received from customer C", 200, 240, page=3)
+    assert snippets.dropped == 7
+    assert snippets.texts() == [
+        "Order number 2 received from customer C",
+        "Order number 0 received from customer A",
+        "Order number 1 received from customer B",
+    ]
+    assert snippets.pages() == [3, 1, 2]
@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from finsum import ComprehensiveFinancialAnalyzer
+from finsum.analyzer import AnalysisResult
+from finsum.jobs import DONE, FAILED, RUNNING, JobQueue, QueueFull
+
+
+class FakeAnalyzer:
+    """Finishes at once, or after release is set, or fails when fail is set"""
+
+    cache = None
+    cache_hit = None
+
+    def __init__(self, release=None, fail=False):
+        self.release = release
+        self.fail = fail
+
+    def analyze_incremental(self, source, filename=None):
+        if self.release is not None:
+            self.release.wait(10)
+        if self.fail:
+            raise ValueError("unreadable")
+        yield {'done': True, 'result': AnalysisResult(filename=filename)}
+
+
+def wait_for(queue, job):
+    assert queue.wait(job, timeout=30)
+    return job
+
+
+def test_same_document_gets_the_existing_job():
+    queue = JobQueue(FakeAnalyzer, workers=1)
+    job = wait_for(queue, queue.submit(b"%PDF-1 a", "a.pdf"))
+    assert queue.submit(b"%PDF-1 a", "again.pdf") is job
+    assert job.status == DONE
+
+
+def test_failed_job_is_queued_again():
+    queue = JobQueue(lambda: FakeAnalyzer(fail=True), workers=1)
+    job = wait_for(queue, queue.submit(b"%PDF-1 a", "a.pdf"))
+    assert job.status == FAILED
+    assert "unreadable" in job.error
+    assert queue.submit(b"%PDF-1 a", "a.pdf") is not job
+
+
+def test_submit_raises_queue_full_beyond_max_queued():
+    release = threading.Event()
+    queue = JobQueue(lambda: FakeAnalyzer(release), workers=1, max_queued=1)
+    try:
+        running = queue.submit(b"%PDF-1 a", "a.pdf")
+        while running.status != RUNNING:
+            threading.Event().wait(0.01)
+        waiting = queue.submit(b"%PDF-1 b", "b.pdf")
+        assert queue.position(waiting) == 1
+        with pytest.raises(QueueFull):
+            queue.submit(b"%PDF-1 c", "c.pdf")
+    finally:
+        release.set()
+    wait_for(queue, waiting)
+    assert queue.stats()[DONE] == 2
+
+
+def test_oldest_finished_jobs_are_pruned():
+    queue = JobQueue(FakeAnalyzer, workers=1, max_finished=2)
+    jobs = [wait_for(queue, queue.submit(f"%PDF-1 {i}".encode(), f"{i}.pdf")) for i in range(4)]
+    assert queue.get(jobs[0].id) is None
+    assert queue.get(jobs[1].id) is None
+    assert queue.get(jobs[3].id) is jobs[3]
+
+
+def test_supervised_jobs_use_the_factory_options(synthetic_pdf):
+    queue = JobQueue(lambda: ComprehensiveFinancialAnalyzer(workers=2, cache=False, top_k=1),
+                     workers=1, time_limit=120)
+    job = wait_for(queue, queue.submit(synthetic_pdf, "synthetic.pdf"))
+    assert job.status == DONE, job.error
+    assert job.result.metrics['worker_peak_rss_mb'] is not None
+    assert all(len(items) <= 1 for items in job.result.announcements.values())
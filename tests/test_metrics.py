@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from finsum.metrics import AnalysisMetrics, descendant_pids, process_rss_mb, process_tree_rss_mb
+
+pytestmark = pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="reads /proc")
+
+
+def test_peak_includes_a_spike_inside_a_stage():
+    metrics = AnalysisMetrics()
+    with metrics.stage('spike'):
+        block = bytearray(64 * 1024 * 1024)
+        block[::4096] = b"x" * len(block[::4096])
+        del block
+    assert metrics.to_dict()['process_peak_rss_mb'] >= process_rss_mb() + 50
+
+
+def test_merge_adds_worker_stages_and_peak():
+    worker = AnalysisMetrics()
+    with worker.stage('page_text'):
+        worker.count('page_text', 'pages', 3)
+    metrics = AnalysisMetrics()
+    metrics.merge(worker.to_dict())
+    assert metrics.stages['page_text']['items'] == {'pages': 3}
+    assert metrics.worker_peak_rss_mb == worker.to_dict()['process_peak_rss_mb']
+
+
+def test_results_stored_with_the_old_peak_key_load():
+    data = {'elapsed_seconds': 1.0, 'cpu_seconds': 0.5, 'peak_rss_mb': 42.0, 'stages': {}}
+    assert AnalysisMetrics.from_dict(data).process_peak_rss_mb == 42.0
+
+
+def test_process_tree_includes_child_processes():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        assert child.pid in descendant_pids(os.getpid())
+        assert process_tree_rss_mb(os.getpid()) > process_rss_mb()
+    finally:
+        child.kill()
+        child.wait()
@@ -0,0 +1,41 @@
+import re
+
+import pytest
+
+from finsum.patterns import PatternRegistry
+
+
+def test_compile_returns_one_pattern_per_regex_and_flags():
+    registry = PatternRegistry()
+    first = registry.compile(r"\d+", group='financials')
+    assert registry.compile(r"\d+", group='dedup') is first
+    assert first.group == "financials, dedup"
+    assert registry.compile(r"\d+", re.IGNORECASE) is not first
+
+
+def test_calls_and_matches_are_counted():
+    registry = PatternRegistry()
+    digits = registry.compile(r"\d+", group='test')
+    never = registry.compile(r"zzz", group='test')
+    assert digits.findall("a 1 b 22") == ["1", "22"]
+    assert digits.search("none") is None
+    assert [m.group() for m in digits.finditer("3 and 4")] == ["3", "4"]
+    assert never.sub("x", "text") == "text"
+    rows = {row['pattern']: row for row in registry.report()}
+    assert (rows[r"\d+"]['calls'], rows[r"\d+"]['matches']) == (3, 3)
+    assert rows["zzz"]['never_matched']
+    registry.reset()
+    assert all(row['calls'] == 0 for row in registry.report())
+
+
+def test_call_past_the_timeout_is_no_match():
+    pytest.importorskip("regex")
+    registry = PatternRegistry(timeout=0.05)
+    runaway = registry.compile(r"(a|aa)+$", group='test')
+    text = "a" * 60 + "b"
+    assert runaway.search(text) is None
+    assert runaway.findall(text) == []
+    assert runaway.sub("x", text) == text
+    assert list(runaway.finditer(text)) == []
+    assert runaway.timeouts == 4
+    assert registry.report()[0]['timeouts'] == 4
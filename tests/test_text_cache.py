@@ -0,0 +1,50 @@
+import itertools
+import os
+
+import pytest
+
+from finsum import text_cache
+from finsum.text_cache import PDFTextCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing access times, so the least recently used entry is unambiguous"""
+    ticks = itertools.count(1)
+    monkeypatch.setattr(text_cache.time, "time", lambda: float(next(ticks)))
+
+
+def pages():
+    # Random hex barely compresses, so every document has about the same stored size
+    return [os.urandom(2048).hex()]
+
+
+def test_get_returns_what_put_stored(tmp_path):
+    cache = PDFTextCache(str(tmp_path / "cache.sqlite3"))
+    tables = [{'page': 1, 'table': [["Revenue", "100"]]}]
+    assert cache.get("a") is None
+    cache.put("a", ["page one", ""], tables)
+    assert cache.get("a") == {'pages': ["page one", ""], 'tables': tables}
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_least_recently_used_document_is_evicted(tmp_path, clock):
+    cache = PDFTextCache(str(tmp_path / "cache.sqlite3"), max_bytes=7000)
+    cache.put("a", pages(), [])
+    cache.put("b", pages(), [])
+    assert cache.get("a") is not None
+    cache.put("c", pages(), [])
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['size_bytes'] <= stats['max_bytes']
+
+
+def test_document_larger_than_the_limit_is_not_stored(tmp_path):
+    cache = PDFTextCache(str(tmp_path / "cache.sqlite3"), max_bytes=1000)
+    cache.put("a", pages(), [])
+    assert cache.get("a") is None
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,48 @@
+from finsum.text_store import PageText, PageTextStore
+
+PAGES = ["Revenue ₹1,200 cr", "", "Board meeting held on 29 January", "EPS ₹10.50"]
+
+
+def test_spilled_store_reads_back_every_page():
+    store = PageTextStore.from_pages(PAGES, spill_bytes=10)
+    assert store.spilled
+    assert len(store) == len(PAGES)
+    assert list(store) == PAGES
+    assert store.page(3) == "EPS ₹10.50"
+    store.close()
+
+
+def test_spilled_text_matches_the_in_memory_text():
+    in_memory = PageTextStore.from_pages(PAGES, spill_bytes=0)
+    spilled = PageTextStore.from_pages(PAGES, spill_bytes=10)
+    assert not in_memory.spilled
+    assert spilled.text() == in_memory.text() == PageText.join(enumerate(PAGES, 1))
+    assert len(spilled.text()) == spilled.text_length
+    spilled.close()
+
+
+def test_joined_text_maps_offsets_to_pages():
+    text = PageTextStore.from_pages(PAGES, spill_bytes=10).text()
+    assert text.page_of(text.index("Revenue")) == 1
+    assert text.page_of(text.index("Board")) == 3
+    assert text.page_of(text.index("EPS")) == 4
+
+
+def test_spilled_store_keeps_no_joined_text():
+    store = PageTextStore.from_pages(PAGES, spill_bytes=10)
+    first = store.text()
+    assert store.text() is not first
+    assert store.is_text(first)
+    assert store.is_text(str(first))
+    assert not store.is_text(str(first) + " ")
+    in_memory = PageTextStore.from_pages(PAGES, spill_bytes=0)
+    assert in_memory.text() is in_memory.text()
+    store.close()
+
+
+def test_selected_pages_are_numbered_as_in_the_document():
+    store = PageTextStore.from_pages(PAGES, spill_bytes=10)
+    text = store.text([2, 3])
+    assert text == "Board meeting held on 29 January\nEPS ₹10.50\n"
+    assert text.page_of(text.index("EPS")) == 4
+    store.close()
@@ -0,0 +1,48 @@
+import pytest
+
+from finsum import ComprehensiveFinancialAnalyzer
+from finsum.watchdog import analyze_supervised
+
+
+def in_process(pdf_path):
+    analyzer = ComprehensiveFinancialAnalyzer(workers=1, cache=False)
+    assert analyzer.read_pages(pdf_path)
+    return analyzer.analyze_text("synthetic.pdf", None)
+
+
+def test_supervised_result_matches_in_process(synthetic_pdf):
+    result = analyze_supervised(synthetic_pdf, time_limit=120, analyzer_options={'cache': False})
+    expected = in_process(synthetic_pdf)
+    assert not result.partial
+    assert result.financials == expected.financials
+    assert result.announcements == expected.announcements
+
+
+def test_supervised_child_can_start_a_worker_pool(synthetic_pdf):
+    # The child used to be daemonic, which may not start the page-extraction pool
+    result = analyze_supervised(synthetic_pdf, time_limit=120, analyzer_options={'workers': 2, 'cache': False})
+    assert not result.partial
+    assert result.metrics['worker_peak_rss_mb'] is not None
+    assert result.financials == in_process(synthetic_pdf).financials
+
+
+def test_time_limit_returns_partial_result_with_every_category(synthetic_pdf):
+    result = analyze_supervised(synthetic_pdf, time_limit=0.01, analyzer_options={'cache': False})
+    empty = ComprehensiveFinancialAnalyzer(cache=False)
+    assert result.partial
+    assert result.aborted['reason'] == 'time_limit'
+    assert set(result.announcements) == set(empty.extract_corporate_announcements(""))
+    assert set(result.operations) == set(empty.extract_business_operations(""))
+    assert result.report
+
+
+def test_memory_limit_counts_worker_processes(synthetic_pdf):
+    result = analyze_supervised(synthetic_pdf, time_limit=120, memory_limit_mb=1,
+                                analyzer_options={'workers': 2, 'cache': False})
+    assert result.aborted['reason'] == 'memory_limit'
+    assert result.aborted['peak_rss_mb'] > 1
+
+
+def test_unreadable_document_raises():
+    with pytest.raises(RuntimeError):
+        analyze_supervised(b"not a pdf", "broken.pdf", time_limit=60, analyzer_options={'cache': False})